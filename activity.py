@@ -0,0 +1,189 @@
+import numpy as np
+from engine import ParticleSystem
+
+
+# Connected Component of every Node through the given Springs, labelled by its lowest Node:
+# Labels are hooked to the lower Label across every Spring, then Pointers are jumped until nothing changes
+def components(node1: np.ndarray, node2: np.ndarray, points_num: int) -> np.ndarray:
+
+    label = np.arange(points_num)
+    while True:
+        first, second = label[node1], label[node2]
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        differ = low != high
+        if not differ.any():
+            return label
+        np.minimum.at(label, high[differ], low[differ])
+        while True:
+            jumped = label[label]
+            if np.array_equal(jumped, label):
+                break
+            label = jumped
+
+
+class ActivityTracker:
+
+    __slots__ = ('speed', 'acceleration', 'steps', 'tolerance', 'system', 'springs_num', 'fixed', 'island', 'order', 'starts', 'asleep', 'quiet', 'previous_vel', 'rest_pos', 'nodes', 'springs', 'awake', 'interval', 'calls', 'sleeping')
+
+    def __init__(self, speed: float = 1e-3, acceleration: float = None, steps: int = 60, tolerance: float = 1e-3) -> None:
+
+        # Variable Declaration
+        self.speed = speed                          # Speed below which a Node is quiet
+        self.acceleration = 10 * speed if acceleration is None else acceleration   # Net Acceleration (Force per Mass) below which a Node is quiet
+        self.steps = steps                          # Steps every Node of an Island must stay quiet before it sleeps
+        self.tolerance = tolerance                  # Displacement of a sleeping Node (Contact, Drag, ...) that wakes its Island
+        self.system = None                          # System the Islands were found for
+        self.springs_num = None
+        self.fixed = None                           # Fixed Nodes the Islands were found with (dragging pins and unpins Nodes)
+        self.island = None                          # Island of every Node
+        self.order = None                           # Nodes sorted by Island
+        self.starts = None                          # Where every Island starts in that Order
+        self.asleep = None                          # Whether every Island sleeps
+        self.quiet = None                           # Steps every Node has been quiet for
+        self.previous_vel = None                    # Velocities of the last Step, their Change gives the Net Force
+        self.rest_pos = None                        # Positions the sleeping Nodes fell asleep at
+        self.nodes = None                           # Nodes stepped while some Island sleeps, None when every Island is awake
+        self.springs = None                         # Springs among them
+        self.awake = None                           # Compact System holding the awake Nodes and Springs
+
+        # Activity is checked every few Steps only, so tracking costs little while everything moves
+        self.interval = max(1, steps // 10)         # Steps between two Checks
+        self.calls = 0
+        self.sleeping = 0                           # Sleeping Nodes at the last Check
+
+    # Islands are the Components of the Spring Graph, Fixed Nodes do not join them as they pass no Motion on
+    def prepare(self, system: ParticleSystem) -> None:
+
+        if self.system is system and self.springs_num == system.springs_num and np.array_equal(self.fixed, system.fixed):
+            return
+        # Nodes asleep so far, when the Topology or the Fixed Nodes of the same System changed
+        same = self.system is system and len(self.island) == system.points_num
+        was_asleep = self.asleep[self.island] if same else np.zeros(system.points_num, dtype = bool)
+
+        moving = ~(system.fixed[system.node1] | system.fixed[system.node2])
+        self.island = components(system.node1[moving], system.node2[moving], system.points_num)
+        self.order = np.argsort(self.island, kind = 'stable')
+        self.starts = np.flatnonzero(np.diff(self.island[self.order], prepend = -1))
+
+        # A new Island keeps sleeping only if every one of its Nodes was asleep
+        self.asleep = np.zeros(system.points_num, dtype = bool)
+        self.asleep[self.island[self.order[self.starts]]] = np.logical_and.reduceat(was_asleep[self.order], self.starts)
+        if not same:
+            self.quiet = np.zeros(system.points_num, dtype = np.int64)
+            self.previous_vel = system.vel.copy()
+            self.rest_pos = system.pos.copy()
+        self.system = system
+        self.springs_num = system.springs_num
+        self.fixed = system.fixed.copy()
+        self.rebuild()
+
+    # Gathers the awake Islands (and the Fixed Nodes they hang from) into a compact System
+    def rebuild(self) -> None:
+
+        system = self.system
+        sleeping = self.asleep[self.island] & ~system.fixed
+        if not sleeping.any():
+            self.nodes = self.springs = self.awake = None
+            return
+
+        self.springs = np.flatnonzero(~(sleeping[system.node1] | sleeping[system.node2]))
+        used = np.zeros(system.points_num, dtype = bool)
+        used[system.node1[self.springs]] = True
+        used[system.node2[self.springs]] = True
+        self.nodes = np.flatnonzero(used | ~sleeping & ~system.fixed)
+        local = np.full(system.points_num, -1)
+        local[self.nodes] = np.arange(len(self.nodes))
+        self.awake = ParticleSystem.from_arrays(
+            pos = system.pos[self.nodes],
+            node1 = local[system.node1[self.springs]],
+            node2 = local[system.node2[self.springs]],
+            length = system.length[self.springs],
+            elasticity = system.elasticity[self.springs],
+            mass = system.mass[self.nodes],
+            fixed = system.fixed[self.nodes],
+            friction = system.friction[self.nodes]
+        )
+
+    # System to step: the whole one while every Island is awake, otherwise the awake Part with the current State
+    def begin(self, system: ParticleSystem) -> ParticleSystem:
+
+        self.prepare(system)
+        if self.awake is None:
+            return system
+        awake, nodes = self.awake, self.nodes
+        np.take(system.pos, nodes, axis = 0, out = awake.pos)
+        np.take(system.prev_pos, nodes, axis = 0, out = awake.prev_pos)
+        np.take(system.vel, nodes, axis = 0, out = awake.vel)
+        np.take(system.fixed, nodes, out = awake.fixed)
+        return awake
+
+    def end(self, system: ParticleSystem, stepped: ParticleSystem) -> None:
+
+        if stepped is system:
+            return
+        system.pos[self.nodes] = stepped.pos
+        system.prev_pos[self.nodes] = stepped.prev_pos
+        system.vel[self.nodes] = stepped.vel
+
+        # The Springs of the sleeping Islands were not evaluated, so the Energy is computed again when needed
+        system.elastic = None
+
+    # Wakes the Islands of the given Nodes and of the Nodes they are tied to, as they are now (after a Spring was
+    # deleted, a Node unpinned or a pinned Node dragged, which is an Island of its own)
+    def wake(self, nodes) -> None:
+
+        if self.system is None:
+            return
+        system = self.system
+        self.prepare(system)
+        nodes = np.asarray(nodes)
+        touching = np.isin(system.node1, nodes) | np.isin(system.node2, nodes)
+        islands = np.unique(self.island[np.concatenate((nodes, system.node1[touching], system.node2[touching]))])
+        if self.asleep[islands].any():
+            self.asleep[islands] = False
+            self.quiet[np.isin(self.island, islands)] = 0
+            self.rebuild()
+
+    # Once per Step: Islands quiet long enough fall asleep, sleeping Islands moved from outside wake up,
+    # returns the Number of sleeping Nodes
+    def update(self, system: ParticleSystem, dt: float) -> int:
+
+        self.calls += 1
+        if self.calls % self.interval:
+            return self.sleeping
+        self.prepare(system)
+        dt *= self.interval
+
+        # A sleeping Node pushed by a Contact or dragged wakes its whole Island
+        if self.awake is not None:
+            sleeping = np.flatnonzero(self.asleep[self.island] & ~system.fixed)
+            shift = system.pos[sleeping] - self.rest_pos[sleeping]
+            moved = np.einsum('ij,ij->i', shift, shift) > self.tolerance ** 2
+            if moved.any():
+                self.wake(sleeping[moved])
+
+        # Speed and Net Acceleration of every Node
+        speed = np.einsum('ij,ij->i', system.vel, system.vel)
+        change = system.vel - self.previous_vel
+        acceleration = np.einsum('ij,ij->i', change, change) / dt ** 2
+        self.previous_vel[:] = system.vel
+        still = (speed < self.speed ** 2) & (acceleration < self.acceleration ** 2) | system.fixed
+        self.quiet = np.where(still, self.quiet + self.interval, 0)
+
+        # An Island sleeps when its most restless Node has been quiet long enough
+        least = np.minimum.reduceat(self.quiet[self.order], self.starts)
+        islands = self.island[self.order[self.starts]]
+        tired = np.zeros(system.points_num, dtype = bool)
+        tired[islands[least >= self.steps]] = True
+        tired &= ~self.asleep
+        if tired.any():
+            self.asleep |= tired
+
+            # Sleeping Nodes stop exactly where they are, at Rest
+            falling = tired[self.island] & ~system.fixed
+            system.vel[falling] = 0
+            system.prev_pos[falling] = system.pos[falling]
+            self.rest_pos[falling] = system.pos[falling]
+            self.rebuild()
+        self.sleeping = int((self.asleep[self.island] & ~system.fixed).sum())
+        return self.sleeping
@@ -0,0 +1,88 @@
+import math
+import numpy as np
+from engine import ParticleSystem
+from diagnostics import EnergyMonitor
+
+class AdaptiveStepper:
+
+    __slots__ = ('explicit', 'safety', 'courant', 'tolerance', 'scale', 'frequency', 'springs_num', 'h', 'read')
+
+    def __init__(self, safety: float = 0.5, courant: float = 0.25, tolerance: float = 0.01, explicit: bool = True) -> None:
+
+        # Variable Declaration
+        self.explicit = explicit        # Implicit Integration needs no Frequency or Friction Limit
+        self.safety = safety            # Fraction of the Critical Step actually taken
+        self.courant = courant          # Fraction of the shortest Spring a Node may travel in one Step
+        self.tolerance = tolerance      # Relative Energy Growth per Sample treated as Instability
+        self.scale = 1.0                # Shrinks on Energy Growth, recovers while the System is calm
+        self.frequency = None           # Highest Natural Frequency of the Springs
+        self.springs_num = None         # Number of Springs the Frequency was computed for
+        self.h = None                   # Substep used last, to rescale the Verlet History
+        self.read = 0                   # Energy Samples already looked at
+
+    # Upper Bound of the Natural Frequency (Gershgorin bound of the Stiffness over the Mass)
+    def max_frequency(self, system: ParticleSystem) -> float:
+
+        if self.springs_num != system.springs_num:
+            points_num = system.points_num
+            stiffness = np.bincount(system.node1, system.elasticity, points_num) + np.bincount(system.node2, system.elasticity, points_num)
+            stiffness[system.fixed] = 0
+            self.frequency = math.sqrt(float((2 * stiffness * system.inv_mass).max(initial = 0)))
+            self.springs_num = system.springs_num
+        return self.frequency
+
+    # Largest Step that keeps the explicit Integrators stable
+    def stable_dt(self, system: ParticleSystem, dt: float) -> float:
+
+        h = dt
+
+        if self.explicit:
+
+            # Oscillation of the stiffest Spring (Verlet and Symplectic Euler need h * w < 2)
+            frequency = self.max_frequency(system)
+            if frequency > 0:
+                h = min(h, self.safety * 2 / frequency)
+
+            # Friction is integrated explicitly too
+            friction = float(system.friction.max(initial = 0))
+            if friction > 0:
+                h = min(h, self.safety * 2 / friction)
+
+        # No Node may cross a large part of the shortest Spring in one Step
+        speed = math.sqrt(float(np.einsum('ij,ij->i', system.vel, system.vel).max(initial = 0)))
+        if speed > 0 and system.springs_num:
+            h = min(h, self.courant * float(system.length.min()) / speed)
+
+        return h * self.scale
+
+    # Number and Size of the Substeps covering one Frame of length dt
+    def plan(self, system: ParticleSystem, dt: float) -> tuple:
+
+        substeps = max(1, math.ceil(dt / self.stable_dt(system, dt) - 1e-9))
+        h = dt / substeps
+
+        # Verlet stores the previous Position, which has to match the new Step
+        if self.h is not None and h != self.h:
+            system.prev_pos[:] = system.pos - (system.pos - system.prev_pos) * (h / self.h)
+        self.h = h
+        return substeps, h
+
+    # Energy Growth between two Samples as an Error Signal
+    def observe(self, energy: EnergyMonitor) -> None:
+
+        if energy.count == self.read:
+            return
+        samples = energy.samples(energy.count - 2)
+        self.read = energy.count
+        if len(samples) < 2:
+            return
+
+        previous, latest = samples[-2], samples[-1]
+        magnitude = abs(previous[EnergyMonitor.KINETIC]) + abs(previous[EnergyMonitor.GRAVITATIONAL]) + abs(previous[EnergyMonitor.ELASTIC])
+        growth = (latest[EnergyMonitor.TOTAL] - previous[EnergyMonitor.TOTAL]) / max(magnitude, np.finfo(float).eps)
+
+        # Halve the Steps when Energy appears from nowhere, recover slowly otherwise
+        if not np.isfinite(growth) or growth > self.tolerance:
+            self.scale = max(self.scale / 2, 1 / 1024)
+        else:
+            self.scale = min(self.scale * 1.25, 1.0)
@@ -0,0 +1,170 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from simulation import Simulation
+
+
+# Builds a Scene headless without stepping it
+def build(scene: str, integration: str, energy_interval: int = 10, engine: str = 'force') -> Simulation:
+
+    sim = Simulation(
+        elasticity = 1000,
+        mass = 10,
+        friction = False,
+        gravity = (0, -9.81, 0),
+        dt = 0.01,
+        integration = integration,
+        headless = True,
+        steps = 0,
+        energy_interval = energy_interval,
+        engine = engine
+    )
+    sim.scene(scene)
+    return sim
+
+
+# Steps a Scene through the same Step as a Run, so every Engine and Integration is measured as it really runs,
+# the Time of every Phase comes from the Profiler of the Simulation. With render, the batched Renderer draws after
+# every Step as in the GUI, timed in its own Phase and left out of the Steps per Second (needs vpython)
+def measure(scene: str, integration: str, steps: int, energy_interval: int = 10, engine: str = 'force', render: bool = False) -> dict:
+
+    sim = build(scene, integration, energy_interval, engine)
+    system = sim.system
+    renderer = None
+    if render:
+        from renderer import BatchRenderer
+        if not sim.points:
+            sim.create_views()
+        renderer = BatchRenderer(system, sim.springs)
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step()
+        if renderer is not None:
+            with sim.profiler.phase('render'):
+                renderer.draw()
+    seconds = time.perf_counter() - start - sim.profiler.timers.get('render', 0)
+
+    return {
+        'scene': scene,
+        'engine': engine,
+        'integration': integration if engine == 'force' else None,     # XPBD projects Positions itself
+        'points': system.points_num,
+        'springs': system.springs_num,
+        'steps': steps,
+        'seconds': seconds,
+        'steps_per_sec': steps / seconds,
+        'particle_updates_per_sec': steps * system.points_num / seconds,
+        'phases': dict(sim.profiler.timers),
+        'stable': bool(np.isfinite(system.pos).all())
+    }
+
+
+# Peak Memory of Building a Scene and Stepping it a few times (traced apart, as tracing slows the Timings)
+def peak_memory(scene: str, integration: str, steps: int, engine: str = 'force') -> int:
+
+    tracemalloc.start()
+    sim = build(scene, integration, engine = engine)
+    for _ in range(steps):
+        sim.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+# Command Lines whose Startup is measured, with their Time Budget in Seconds
+STARTUP = {
+    'help': (['main.py', '--help'], 0.15),
+    'headless': (['main.py', '-t', 'rope', '--headless', '--steps', '1'], 0.5)
+}
+
+
+# Best Wall Time of every Command Line over a few fresh Interpreters, checked against its Budget
+def startup(repeats: int = 5, scale: float = 1) -> dict:
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, (command, budget) in STARTUP.items():
+        best = float('inf')
+        for _ in range(repeats):
+            tic = time.perf_counter()
+            subprocess.run([sys.executable, *command], cwd = directory, capture_output = True, check = True)
+            best = min(best, time.perf_counter() - tic)
+        results[name] = {'command': ' '.join(command), 'seconds': best, 'budget': budget * scale, 'within_budget': best <= budget * scale}
+    return results
+
+
+def revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+
+    """
+        Runs every Scene headless for a fixed Number of Steps with every Engine and Integration Method
+        and writes Steps per Second, Time per Phase and Peak Memory as JSON.
+        --render also times a Draw of the batched Renderer after every Step (the render Phase, which needs vpython).
+        With --startup only the Startup Time of the CLI (--help and a one Step headless Run) is measured,
+        and the Exit Status is 1 when a Command exceeds its Budget (scaled by --budget-scale on slow Machines)
+    """
+    parser = argparse.ArgumentParser(
+        prog='Cloth Simulation Benchmark',
+        description='Measures solver throughput across scenes, mesh sizes and integration methods'
+    )
+    parser.add_argument('-s', '--steps', type = int, default = 200)
+    parser.add_argument('--sizes', type = int, nargs = '*', default = [100, 250])
+    parser.add_argument('--scenes', nargs = '*', default = ['rope', 'grid', 'cloth1', 'cloth2'])
+    parser.add_argument('-i', '--integrations', nargs = '*', choices = ['Verlet', 'RK1', 'Implicit'], default = ['Verlet', 'RK1'])
+    parser.add_argument('--engines', nargs = '*', choices = ['force', 'xpbd'], default = ['force'])
+    parser.add_argument('-e', '--energy-interval', type = int, default = 10)
+    parser.add_argument('-o', '--output', default = 'benchmark.json')
+    parser.add_argument('--render', action = 'store_true')
+    parser.add_argument('--startup', action = 'store_true')
+    parser.add_argument('--repeats', type = int, default = 5)
+    parser.add_argument('--budget-scale', type = float, default = 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level = logging.INFO, format = '%(message)s')
+
+    if args.startup:
+        results = startup(args.repeats, args.budget_scale)
+        for name, result in results.items():
+            logging.info(f"{name:>10}: {1000 * result['seconds']:7.1f} ms (budget {1000 * result['budget']:.0f} ms) {'ok' if result['within_budget'] else 'OVER BUDGET'}")
+        raise SystemExit(0 if all(result['within_budget'] for result in results.values()) else 1)
+
+    scenes = args.scenes + [f'sheet-{size}' for size in args.sizes]
+    results = []
+    for scene in scenes:
+        for engine in args.engines:
+
+            # The Integration Method does not change XPBD, so it is measured once
+            for integration in args.integrations if engine == 'force' else args.integrations[:1]:
+                result = measure(scene, integration, args.steps, args.energy_interval, engine, args.render)
+                result['peak_memory_bytes'] = peak_memory(scene, integration, min(args.steps, 10), engine)
+                results.append(result)
+                logging.info(
+                    f"{scene:>10} {engine:>5} {result['integration'] or '-':>8}: {result['steps_per_sec']:10.1f} steps/s "
+                    f"{result['particle_updates_per_sec']:12.0f} particle-updates/s "
+                    f"{result['peak_memory_bytes'] / 2 ** 20:8.1f} MiB"
+                )
+
+    report = {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'steps': args.steps,
+        'energy_interval': args.energy_interval,
+        'results': results
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent = 2)
@@ -0,0 +1,139 @@
+import numpy as np
+from engine import ParticleSystem
+
+# Cell Coordinates are packed in 21 bits each, offset so negative Cells stay positive
+BITS = 21
+OFFSET = 1 << (BITS - 1)
+
+# Key Offsets of the 27 Cells around (and including) a Cell
+NEIGHBORS = np.array([
+    (dx << (2 * BITS)) + (dy << BITS) + dz
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+], dtype = np.int64)
+
+# Half of them (the Cell itself first), so every pair of neighboring Cells is visited once
+HALF_NEIGHBORS = np.sort(NEIGHBORS[NEIGHBORS >= 0])
+
+
+class SpatialHash:
+
+    __slots__ = ('cell_size', 'order', 'keys', 'sorted_keys')
+
+    def __init__(self, cell_size: float) -> None:
+
+        # Variable Declaration
+        self.cell_size = cell_size      # Side of the Cubic Cells
+        self.order = None               # Particles sorted by Cell
+        self.keys = None                # Cell Key of every Particle
+        self.sorted_keys = None         # Cell Keys in sorted Order
+
+    def cell_keys(self, pos: np.ndarray) -> np.ndarray:
+        cells = np.floor(pos / self.cell_size).astype(np.int64) + OFFSET
+        return (cells[:, 0] << (2 * BITS)) + (cells[:, 1] << BITS) + cells[:, 2]
+
+    # Re-sorts the Particles by Cell, starting from the previous Order so an almost sorted Array is sorted
+    def update(self, pos: np.ndarray) -> None:
+
+        self.keys = self.cell_keys(pos)
+        if self.order is None or len(self.order) != len(pos):
+            self.order = np.argsort(self.keys, kind = 'stable')
+        else:
+            self.order = self.order[np.argsort(self.keys[self.order], kind = 'stable')]
+        self.sorted_keys = self.keys[self.order]
+
+    # Candidate Pairs (i, j) with i < j lying in neighboring Cells
+    def candidate_pairs(self) -> tuple:
+
+        # Cells holding at least one Particle, with their Range inside the sorted Order
+        cells, start, count = np.unique(self.sorted_keys, return_index = True, return_counts = True)
+
+        first, second = [], []
+        for offset in HALF_NEIGHBORS:
+
+            # Match every occupied Cell with its occupied Neighbor along this Offset
+            other = np.searchsorted(cells, cells + offset)
+            other = np.minimum(other, len(cells) - 1)
+            found = cells[other] == cells + offset
+            a, b = np.nonzero(found)[0], other[found]
+            pairs_num = count[a] * count[b]
+            total = int(pairs_num.sum())
+            if total == 0:
+                continue
+
+            # Expand every Particle of the Cell against every Particle of the Neighbor
+            cell_pair = np.repeat(np.arange(len(a)), pairs_num)
+            within = np.arange(total) - np.repeat(np.cumsum(pairs_num) - pairs_num, pairs_num)
+            i = self.order[start[a][cell_pair] + within // count[b][cell_pair]]
+            j = self.order[start[b][cell_pair] + within % count[b][cell_pair]]
+
+            # Inside the same Cell each Pair appears twice, plus every Particle with itself
+            if offset == 0:
+                keep = i < j
+                i, j = i[keep], j[keep]
+            first.append(np.minimum(i, j))
+            second.append(np.maximum(i, j))
+
+        if not first:
+            return np.zeros(0, dtype = np.intp), np.zeros(0, dtype = np.intp)
+        return np.concatenate(first), np.concatenate(second)
+
+    # Pairs of Particles closer than radius (radius must not exceed the Cell Size)
+    def pairs(self, pos: np.ndarray, radius: float) -> tuple:
+
+        i, j = self.candidate_pairs()
+        distance = np.linalg.norm(pos[i] - pos[j], axis = 1)
+        close = distance < radius
+        return i[close], j[close], distance[close]
+
+    # Nearest Particle to a Position within one Cell Size, None if there is none
+    def nearest(self, pos: np.ndarray, position: np.ndarray) -> int | None:
+
+        keys = self.cell_keys(position[None, :])[0] + NEIGHBORS
+        start = np.searchsorted(self.sorted_keys, keys, 'left')
+        end = np.searchsorted(self.sorted_keys, keys, 'right')
+        candidates = np.concatenate([self.order[a:b] for a, b in zip(start, end)])
+        if len(candidates) == 0:
+            return None
+
+        distance = np.linalg.norm(pos[candidates] - position, axis = 1)
+        best = np.argmin(distance)
+        if distance[best] > self.cell_size:
+            return None
+        return int(candidates[best])
+
+
+class SelfCollision:
+
+    __slots__ = ('thickness', 'spatial_hash')
+
+    def __init__(self, thickness: float = 0.1) -> None:
+
+        # Variable Declaration
+        self.thickness = thickness                  # Minimum Distance kept between two Particles
+        self.spatial_hash = SpatialHash(thickness)  # Cells as large as the Thickness, so only Neighbors can touch
+
+    # Pushes apart every pair of Particles closer than the Thickness
+    def resolve(self, system: ParticleSystem) -> int:
+
+        self.spatial_hash.update(system.pos)
+        i, j, distance = self.spatial_hash.pairs(system.pos, self.thickness)
+        if len(i) == 0:
+            return 0
+
+        # Each free Particle moves by its Share of the Overlap, weighted by Inverse Mass
+        inv_mass = np.where(system.fixed, 0, system.inv_mass)
+        weight = inv_mass[i] + inv_mass[j]
+        moving = weight > 0
+        i, j, distance, weight = i[moving], j[moving], distance[moving], weight[moving]
+
+        direction = system.pos[i] - system.pos[j]
+        direction /= np.maximum(distance, np.finfo(float).tiny)[:, None]
+        correction = ((self.thickness - distance) / weight)[:, None] * direction
+
+        points_num = system.points_num
+        shift = np.zeros((points_num, 3))
+        for axis in range(3):
+            shift[:, axis] += np.bincount(i, correction[:, axis] * inv_mass[i], points_num)
+            shift[:, axis] -= np.bincount(j, correction[:, axis] * inv_mass[j], points_num)
+        system.pos += shift
+        return len(i)
@@ -1,27 +1,63 @@
 from point import Point
-from vpython import curve
+import numpy as np
+from engine import ParticleSystem
 
 class Spring:
 
-    __slots__ = ('node1', 'node2', 'length', 'elasticity', 'line')
+    __slots__ = ('node1', 'node2', 'system', 'index', 'line')
 
     def __init__(self, node1: Point, node2: Point, length: float, elasticity: float) -> None:
 
+        # Until the Simulation gathers it, the Spring lives in a System of its own
+        self.system = ParticleSystem(0, 1)  # Arrays Storing the Rest Length and Elasticity
+        self.index = 0                      # Row of the Spring inside the System
+
         # Variable Declaration
         self.node1 = node1              # Node attached to the Beginning of the Spring
-        self.node2 = node2              # Node attached to the End of the Spring    
+        self.node2 = node2              # Node attached to the End of the Spring
         self.length = length            # Length at Rest
         self.elasticity = elasticity    # Elasticity of the Spring
+        self.line = None                # Curve Rendering the Spring (set by the Renderer)
+
+    # Creates a Spring viewing a Row of an existing System
+    @classmethod
+    def view(cls, system: ParticleSystem, index: int, node1: Point, node2: Point) -> 'Spring':
+        spring = cls.__new__(cls)
+        spring.system = system
+        spring.index = index
+        spring.node1 = node1
+        spring.node2 = node2
+        spring.line = None
+        return spring
+
+    # Turns the Spring into a View over a Row of another System
+    def bind(self, system: ParticleSystem, index: int) -> None:
+        self.system = system
+        self.index = index
+
+    @property
+    def length(self) -> float:
+        return float(self.system.length[self.index])
 
-        # Rendering the Spring
-        self.line = curve(self.node1.pos, self.node2.pos)
+    @length.setter
+    def length(self, value: float) -> None:
+        self.system.length[self.index] = value
+
+    @property
+    def elasticity(self) -> float:
+        return float(self.system.elasticity[self.index])
+
+    @elasticity.setter
+    def elasticity(self, value: float) -> None:
+        self.system.elasticity[self.index] = value
 
     def apply_constraints(self) -> None:
 
         # Compute Elastic Force
         nodes_displacement = self.node1.pos - self.node2.pos
-        deformation = nodes_displacement.mag - self.length
-        elastic_force = deformation * self.elasticity * nodes_displacement.norm()
+        distance = np.linalg.norm(nodes_displacement)
+        deformation = distance - self.length
+        elastic_force = deformation * self.elasticity * nodes_displacement / distance
 
         # Add Elastic Force to the two Nodes
         self.node1.add_force(-1 * elastic_force)
@@ -29,12 +65,5 @@ class Spring:
 
     def elastic_energy(self) -> float:
         nodes_displacement = self.node1.pos - self.node2.pos
-        deformation = nodes_displacement.mag - self.length
+        deformation = np.linalg.norm(nodes_displacement) - self.length
         return 1 / 2 * self.elasticity * deformation ** 2
-        
-
-    def display(self) -> None:
-
-        # Rendering the Updated Spring 
-        self.line.modify(0, self.node1.pos)
-        self.line.modify(1, self.node2.pos)
@@ -0,0 +1,53 @@
+import numpy as np
+from engine import ParticleSystem
+
+class EnergyMonitor:
+
+    __slots__ = ('interval', 'history', 'count', 'read', 'steps')
+
+    # Columns of the History
+    T, KINETIC, GRAVITATIONAL, ELASTIC, TOTAL = range(5)
+
+    def __init__(self, interval: int = 10, capacity: int = 4096) -> None:
+
+        # Variable Declaration
+        self.interval = max(1, interval)        # Steps between two Samples
+        self.history = np.zeros((capacity, 5))  # Ring Buffer of (t, kinetic, gravitational, elastic, total)
+        self.count = 0                          # Samples written since the Beginning
+        self.read = 0                           # Samples already handed out by drain
+        self.steps = 0                          # Steps seen since the Beginning
+
+    # Called once per Step, only samples every interval Steps
+    def update(self, t: float, system: ParticleSystem, g: np.ndarray) -> bool:
+
+        self.steps += 1
+        if self.steps % self.interval:
+            return False
+
+        # Elastic Energy reuses the Deformation of the last Constraint Pass
+        kinetic_energy = system.kinetic_energy()
+        gravitational_energy = system.gravitational_energy(g)
+        elastic_energy = system.elastic_energy()
+        total_energy = kinetic_energy + gravitational_energy + elastic_energy
+
+        self.history[self.count % len(self.history)] = (t, kinetic_energy, gravitational_energy, elastic_energy, total_energy)
+        self.count += 1
+        return True
+
+    # Samples in chronological Order, at most the capacity of the Ring Buffer
+    def samples(self, first: int = 0) -> np.ndarray:
+
+        capacity = len(self.history)
+        first = max(first, self.count - capacity)
+        return self.history[np.arange(first, self.count) % capacity]
+
+    # Samples written since the last Call, so Plots can be fed in Batches
+    def drain(self) -> np.ndarray:
+        batch = self.samples(self.read)
+        self.read = self.count
+        return batch
+
+    def latest(self) -> np.ndarray | None:
+        if self.count == 0:
+            return None
+        return self.history[(self.count - 1) % len(self.history)]
@@ -0,0 +1,253 @@
+import numpy as np
+
+
+# Converts a vpython vector (or any 3-sequence) into a float array
+def to_array(v) -> np.ndarray:
+    if hasattr(v, 'x'):
+        return np.array((v.x, v.y, v.z), dtype = float)
+    return np.asarray(v, dtype = float).reshape(3)
+
+
+# Spring Kernel shared by every Constraint Pass: fills the Buffers of the given Springs and returns their Elastic Energy,
+# force[0] and force[1] end up holding the Force on the First and on the Second Node
+def spring_forces(pos: np.ndarray, node1: np.ndarray, node2: np.ndarray, length: np.ndarray, elasticity: np.ndarray,
+                  displacement: np.ndarray, distance: np.ndarray, deformation: np.ndarray, force: np.ndarray) -> float:
+
+    # Displacement and Length of every Spring
+    np.take(pos, node1, axis = 0, out = displacement)
+    np.take(pos, node2, axis = 0, out = force[0])
+    np.subtract(displacement, force[0], out = displacement)
+    np.einsum('ij,ij->i', displacement, displacement, out = distance)
+    np.sqrt(distance, out = distance)
+    np.subtract(distance, length, out = deformation)
+
+    # Elastic Energy, reusing the Deformation (force[0, :, 0] is free until the Force is written)
+    energy = force[0, :, 0]
+    np.multiply(deformation, deformation, out = energy)
+    elastic = 1 / 2 * float(np.dot(elasticity, energy))
+
+    # Elastic Force along the Unit Direction (deformation * elasticity / length)
+    np.maximum(distance, np.finfo(float).tiny, out = distance)
+    np.multiply(deformation, elasticity, out = energy)
+    np.divide(energy, distance, out = energy)
+    np.multiply(displacement, energy[:, None], out = force[1])
+    np.negative(force[1], out = force[0])
+    return elastic
+
+
+class ParticleSystem:
+
+    __slots__ = ('pos', 'first_pos', 'prev_pos', 'vel', 'acc', 'mass', 'fixed', 'friction', 'inv_mass', 'node1', 'node2', 'length', 'elasticity', 'displacement', 'distance', 'deformation', 'force', 'scatter', 'elastic')
+
+    def __init__(self, points_num: int = 0, springs_num: int = 0) -> None:
+
+        # Particles (Structure of Arrays)
+        self.pos = np.zeros((points_num, 3))        # Position of the Nodes
+        self.first_pos = np.zeros((points_num, 3))  # Used to compute gravitational Potential Energy
+        self.prev_pos = np.zeros((points_num, 3))   # Used for Numerical Integration
+        self.vel = np.zeros((points_num, 3))        # Velocity of the Nodes
+        self.acc = np.zeros((points_num, 3))        # Acceleration of the Nodes
+        self.mass = np.ones(points_num)             # Mass of the Nodes
+        self.inv_mass = np.ones(points_num)         # Inverse Mass, so Forces are never divided
+        self.fixed = np.zeros(points_num, dtype = bool)     # Determines whether the Nodes are Fixed
+        self.friction = np.zeros(points_num)        # Friction Coefficient of the Nodes
+
+        # Springs (Index Pairs into the Particle Arrays)
+        self.node1 = np.zeros(springs_num, dtype = np.intp)     # Node attached to the Beginning of the Springs
+        self.node2 = np.zeros(springs_num, dtype = np.intp)     # Node attached to the End of the Springs
+        self.length = np.zeros(springs_num)         # Length at Rest
+        self.elasticity = np.zeros(springs_num)     # Elasticity of the Springs
+
+        # Buffers reused by every Constraint Pass
+        self.prepare()
+
+    # (Re)allocates the Spring Buffers, needed whenever the Number of Springs changes
+    def prepare(self) -> None:
+
+        springs_num = self.springs_num
+        self.displacement = np.zeros((springs_num, 3))  # Displacement between the two Nodes
+        self.distance = np.zeros(springs_num)           # Current Length of the Springs
+        self.deformation = np.zeros(springs_num)        # Deformation computed by the last Constraint Pass
+        self.force = np.zeros((2, springs_num, 3))      # Force on the First and on the Second Node
+        self.elastic = None                             # Elastic Energy of the last Constraint Pass
+
+        # Flat Index of every Force Component inside the (N, 3) Acceleration Array, one Row per Node of the Springs
+        nodes = np.stack((self.node1, self.node2))
+        self.scatter = (nodes[:, :, None] * 3 + np.arange(3)).reshape(2, -1)
+
+    def set_mass(self, mass: float | np.ndarray) -> None:
+        self.mass[:] = mass
+        np.divide(1, self.mass, out = self.inv_mass)
+
+    @property
+    def points_num(self) -> int:
+        return len(self.pos)
+
+    @property
+    def springs_num(self) -> int:
+        return len(self.node1)
+
+    # Gathers standalone Points and Springs into one System and turns them into views over it
+    @classmethod
+    def from_views(cls, points: list, springs: list) -> 'ParticleSystem':
+
+        system = cls(len(points), len(springs))
+        for i, point in enumerate(points):
+            system.pos[i] = point.pos
+            system.first_pos[i] = point.first_pos
+            system.prev_pos[i] = point.prev_pos
+            system.vel[i] = point.vel
+            system.acc[i] = point.acc
+            system.fixed[i] = point.fixed
+            system.friction[i] = point.friction
+        system.set_mass([point.mass for point in points])
+        for i, spring in enumerate(springs):
+            system.length[i] = spring.length
+            system.elasticity[i] = spring.elasticity
+
+        # Views are bound only after every value has been copied
+        for i, point in enumerate(points):
+            point.bind(system, i)
+        for i, spring in enumerate(springs):
+            system.node1[i] = spring.node1.index
+            system.node2[i] = spring.node2.index
+            spring.bind(system, i)
+
+        system.prepare()
+        return system
+
+    # Builds a System straight from Arrays, without going through Point and Spring objects
+    @classmethod
+    def from_arrays(cls, pos: np.ndarray, node1: np.ndarray, node2: np.ndarray, length: np.ndarray, elasticity: np.ndarray,
+                    mass: float | np.ndarray = 1, fixed: np.ndarray = None, friction: float | np.ndarray = 0) -> 'ParticleSystem':
+
+        system = cls(len(pos), len(node1))
+        system.pos[:] = pos
+        system.first_pos[:] = pos
+        system.prev_pos[:] = pos
+        system.set_mass(mass)
+        system.friction[:] = friction
+        if fixed is not None:
+            system.fixed[fixed] = True
+        system.node1[:] = node1
+        system.node2[:] = node2
+        system.length[:] = length
+        system.elasticity[:] = elasticity
+        system.prepare()
+        return system
+
+    # Every Array needed to rebuild the System exactly
+    ARRAYS = ('pos', 'first_pos', 'prev_pos', 'vel', 'acc', 'mass', 'fixed', 'friction', 'node1', 'node2', 'length', 'elasticity')
+
+    def arrays(self) -> dict:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_dict(cls, arrays: dict) -> 'ParticleSystem':
+
+        system = cls(len(arrays['pos']), len(arrays['node1']))
+        for name in cls.ARRAYS:
+            getattr(system, name)[:] = arrays[name]
+        system.set_mass(system.mass)
+        system.prepare()
+        return system
+
+    # Spring Rows, Buffers included: they are Views over Arrays allocated once, so removing a Spring only shrinks them
+    SPRING_ARRAYS = ('node1', 'node2', 'length', 'elasticity', 'displacement', 'distance', 'deformation')
+
+    # Copies the Row of a Spring over another one, Buffers included
+    def move_spring(self, source: int, target: int) -> None:
+        for name in self.SPRING_ARRAYS:
+            array = getattr(self, name)
+            array[target] = array[source]
+        self.scatter[:, 3 * target:3 * target + 3] = self.scatter[:, 3 * source:3 * source + 3]
+
+    # Swap-Remove in O(1): the last Spring takes the Row of the removed one, returns the Row the last Spring came from
+    def remove_spring(self, index: int) -> int:
+
+        last = self.springs_num - 1
+        self.move_spring(last, index)
+        for name in self.SPRING_ARRAYS:
+            setattr(self, name, getattr(self, name)[:last])
+        self.force = self.force[:, :last]
+        self.scatter = self.scatter[:, :3 * last]
+        self.elastic = None
+        return last
+
+    # Puts the Spring Rows in the given Order, Views bound to the Rows are left as they are
+    def reorder_springs(self, order: np.ndarray) -> None:
+        for name in self.SPRING_ARRAYS:
+            array = getattr(self, name)
+            array[:] = array[order]
+        self.scatter[:] = self.scatter.reshape(2, -1, 3)[:, order].reshape(2, -1)
+        self.elastic = None
+
+    # Strain (Relative Elongation) of every Spring, taken from the last Constraint Pass when there is one
+    def strain(self) -> np.ndarray:
+        if self.elastic is not None:
+            return self.deformation / self.length
+        return np.linalg.norm(self.pos[self.node1] - self.pos[self.node2], axis = 1) / self.length - 1
+
+    # Fused Spring Pass: Displacement, Length, Force and Energy are computed once into the Buffers,
+    # then every Force Component is added to the Nodes with a Scatter-Add
+    def apply_constraints(self) -> None:
+
+        self.elastic = spring_forces(self.pos, self.node1, self.node2, self.length, self.elasticity, self.displacement, self.distance, self.deformation, self.force)
+
+        # Add Elastic Force to the two Nodes (one Scatter-Add per End, each over a contiguous Row)
+        total = np.bincount(self.scatter[0], self.force[0].ravel(), 3 * self.points_num).astype(float, copy = False)   # Integer when there are no Springs
+        total += np.bincount(self.scatter[1], self.force[1].ravel(), 3 * self.points_num)
+        total = total.reshape(-1, 3)
+        total *= self.inv_mass[:, None]
+        self.acc += total
+
+    def add_gravity(self, g: np.ndarray) -> None:
+        self.acc += g   # Gravitational Force divided by the Mass
+
+    # Updates every Position doing Numerical Integration
+    # A Block (Slice of Nodes) restricts the Update to those Nodes, so disjoint Blocks can be integrated concurrently
+    def integrate(self, dt: float, integration: str = 'Verlet', block: slice = slice(None)) -> None:
+
+        # Fixed points won't be updated
+        free = ~self.fixed[block]
+        all_pos, all_prev_pos, all_vel, all_acc = self.pos[block], self.prev_pos[block], self.vel[block], self.acc[block]
+        pos, prev_pos, vel = all_pos[free], all_prev_pos[free], all_vel[free]
+        acc, friction = all_acc[free], self.friction[block][free, None]
+
+        # Numerical Integration
+        match integration:
+
+            # Basically Euler Method
+            case 'RK1':
+                acc -= friction * vel
+                vel += acc * dt
+                all_vel[free] = vel
+                all_pos[free] = pos + vel * dt
+
+            # Verlet Integration
+            case _:
+                vel = (pos - prev_pos) / dt
+                acc -= friction * vel
+                all_vel[free] = vel
+                all_pos[free] = 2 * pos - prev_pos + acc * dt ** 2
+                all_prev_pos[free] = pos
+
+        all_acc[:] = 0
+
+    def step(self, dt: float, g: np.ndarray, integration: str = 'Verlet') -> None:
+        self.apply_constraints()
+        self.add_gravity(g)
+        self.integrate(dt, integration)
+
+    def kinetic_energy(self) -> float:
+        return 1 / 2 * float(np.dot(self.mass, np.einsum('ij,ij->i', self.vel, self.vel)))
+
+    def gravitational_energy(self, g: np.ndarray) -> float:
+        return -float(np.dot(self.mass, (self.pos - self.first_pos) @ g))
+
+    # Reuses the Energy of the last Constraint Pass when there is one
+    def elastic_energy(self) -> float:
+        if self.elastic is not None:
+            return self.elastic
+        deformation = np.linalg.norm(self.pos[self.node1] - self.pos[self.node2], axis = 1) - self.length
+        return 1 / 2 * float(np.dot(self.elasticity, deformation ** 2))
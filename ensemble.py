@@ -0,0 +1,107 @@
+import numpy as np
+from engine import ParticleSystem
+from implicit import ImplicitEuler
+
+
+class Ensemble:
+
+    __slots__ = ('system', 'copies', 'points_num', 'springs_num', 'gravity', 'field', 'dt', 'integration', 'solver', 't')
+
+    # K Copies of a System stacked into one: Copy k owns the Nodes k*N..(k+1)*N and the Springs k*S..(k+1)*S,
+    # so the usual Kernels step every Copy at once and the State reads as (K, N, 3)
+    def __init__(self, system: ParticleSystem, copies: int, gravity: np.ndarray = (0, -9.81, 0), dt: float = 0.01, integration: str = 'Verlet') -> None:
+
+        # Variable Declaration
+        self.copies = copies                    # Number of independent Instances
+        self.points_num = system.points_num     # Nodes of every Instance
+        self.springs_num = system.springs_num   # Springs of every Instance
+        self.dt = dt
+        self.integration = integration
+        self.solver = ImplicitEuler() if integration == 'Implicit' else None
+        self.t = 0.0
+
+        # Node Arrays are repeated, Spring Nodes are shifted into the Rows of their Copy
+        offsets = np.arange(copies)[:, None] * self.points_num
+        arrays = {}
+        for name, array in system.arrays().items():
+            if name in ('node1', 'node2'):
+                arrays[name] = (array[None, :] + offsets).ravel()
+            else:
+                arrays[name] = np.tile(array, (copies,) + (1,) * (array.ndim - 1))
+        self.system = ParticleSystem.from_dict(arrays)
+
+        # Gravity of every Instance, and the same spread over its Nodes
+        self.gravity = None
+        self.field = None
+        self.set_gravity(gravity)
+
+    # Per-Instance Values: a Scalar for every Instance, one Value per Instance (K,), or one per Element (K, width)
+    def spread(self, values, width: int) -> np.ndarray:
+        values = np.asarray(values, dtype = float)
+        if values.ndim == 1:
+            values = values[:, None]
+        return np.broadcast_to(values, (self.copies, width)).ravel()
+
+    def set_gravity(self, gravity: np.ndarray) -> None:
+        self.gravity = np.broadcast_to(np.asarray(gravity, dtype = float), (self.copies, 3)).copy()
+        self.field = np.repeat(self.gravity, self.points_num, axis = 0)
+
+    def set_mass(self, mass) -> None:
+        self.system.set_mass(self.spread(mass, self.points_num))
+
+    def set_friction(self, friction) -> None:
+        self.system.friction[:] = self.spread(friction, self.points_num)
+
+    def set_elasticity(self, elasticity) -> None:
+        self.system.elasticity[:] = self.spread(elasticity, self.springs_num)
+
+    def set_fixed(self, fixed: np.ndarray) -> None:
+        self.system.fixed[:] = np.broadcast_to(fixed, (self.copies, self.points_num)).ravel()
+
+    # (K, N, 3) Views over the stacked State
+    @property
+    def pos(self) -> np.ndarray:
+        return self.system.pos.reshape(self.copies, self.points_num, 3)
+
+    @property
+    def vel(self) -> np.ndarray:
+        return self.system.vel.reshape(self.copies, self.points_num, 3)
+
+    # One Step of every Instance
+    def step(self) -> None:
+
+        if self.solver is not None:
+            self.solver.step(self.system, self.dt, self.field)
+        else:
+            self.system.apply_constraints()
+            self.system.add_gravity(self.field)
+            self.system.integrate(self.dt, self.integration)
+        self.t += self.dt
+
+    def simulate(self, steps: int) -> np.ndarray:
+        for _ in range(steps):
+            self.step()
+        return self.pos
+
+    # Energies of every Instance, shape (K,)
+    def kinetic_energy(self) -> np.ndarray:
+        system = self.system
+        energy = system.mass * np.einsum('ij,ij->i', system.vel, system.vel)
+        return 1 / 2 * energy.reshape(self.copies, -1).sum(axis = 1)
+
+    def gravitational_energy(self) -> np.ndarray:
+        system = self.system
+        height = np.einsum('ij,ij->i', system.pos - system.first_pos, self.field)
+        return -(system.mass * height).reshape(self.copies, -1).sum(axis = 1)
+
+    def elastic_energy(self) -> np.ndarray:
+
+        system = self.system
+        if system.elastic is not None:
+            deformation = system.deformation
+        else:
+            deformation = np.linalg.norm(system.pos[system.node1] - system.pos[system.node2], axis = 1) - system.length
+        return 1 / 2 * (system.elasticity * deformation ** 2).reshape(self.copies, -1).sum(axis = 1)
+
+    def total_energy(self) -> np.ndarray:
+        return self.kinetic_energy() + self.gravitational_energy() + self.elastic_energy()
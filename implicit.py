@@ -0,0 +1,94 @@
+import numpy as np
+from engine import ParticleSystem
+
+class ImplicitEuler:
+
+    __slots__ = ('iterations', 'tolerance', 'guess', 'blocks', 'last_iterations')
+
+    def __init__(self, iterations: int = 100, tolerance: float = 1e-6) -> None:
+
+        # Variable Declaration
+        self.iterations = iterations    # Maximum Conjugate Gradient Iterations per Step
+        self.tolerance = tolerance      # Residual, relative to the Right Hand Side, that stops the Solver
+        self.guess = None               # Velocity Change of the last Step, used as Warm Start
+        self.blocks = None              # 3x3 Stiffness Block of every Spring
+        self.last_iterations = 0        # Iterations needed by the last Solve
+
+    # Stiffness Jacobian as one 3x3 Block per Spring (Block-Sparse, the Blocks sit at (i,i), (j,j), (i,j), (j,i))
+    def assemble(self, system: ParticleSystem) -> None:
+
+        # Requires the Buffers of a Constraint Pass done on the current Positions
+        direction = system.displacement / system.distance[:, None]
+        outer = direction[:, :, None] * direction[:, None, :]
+
+        # Compressed Springs would make the System indefinite, so their transverse Part is dropped
+        transverse = np.maximum(1 - system.length / system.distance, 0)
+        identity = np.eye(3)[None, :, :]
+        self.blocks = -system.elasticity[:, None, None] * (outer + transverse[:, None, None] * (identity - outer))
+
+    # Stiffness times a Vector, one Block Product per Spring and a Scatter-Add
+    def stiffness_product(self, system: ParticleSystem, x: np.ndarray) -> np.ndarray:
+
+        difference = x[system.node1] - x[system.node2]
+        product = np.einsum('sij,sj->si', self.blocks, difference)
+        result = np.zeros_like(x)
+        for axis in range(3):
+            result[:, axis] += np.bincount(system.node1, product[:, axis], len(x))
+            result[:, axis] -= np.bincount(system.node2, product[:, axis], len(x))
+        return result
+
+    # (M (1 + h c) - h^2 K) x, with the Rows of Fixed Nodes filtered out
+    def product(self, system: ParticleSystem, x: np.ndarray, dt: float, damping: np.ndarray) -> np.ndarray:
+        result = damping[:, None] * x - dt ** 2 * self.stiffness_product(system, x)
+        result[system.fixed] = 0
+        return result
+
+    # Backward Euler: solves (M (1 + h c) - h^2 K) dv = h (f + h K v) with a warm-started Conjugate Gradient
+    def step(self, system: ParticleSystem, dt: float, g: np.ndarray) -> None:
+
+        system.apply_constraints()
+        system.add_gravity(g)
+        self.assemble(system)
+
+        # Friction is a Damping Force -m c v, treated implicitly as well
+        damping = system.mass * (1 + dt * system.friction)
+        force = system.mass[:, None] * (system.acc - system.friction[:, None] * system.vel)
+        rhs = dt * (force + dt * self.stiffness_product(system, system.vel))
+        rhs[system.fixed] = 0
+
+        # Jacobi Preconditioner from the Diagonal of the Matrix
+        diagonal = np.zeros((system.points_num, 3))
+        block_diagonal = np.einsum('sii->si', self.blocks)
+        for axis in range(3):
+            diagonal[:, axis] += np.bincount(system.node1, block_diagonal[:, axis], system.points_num)
+            diagonal[:, axis] += np.bincount(system.node2, block_diagonal[:, axis], system.points_num)
+        inverse = 1 / (damping[:, None] - dt ** 2 * diagonal)
+
+        # Warm Start from the last Velocity Change
+        dv = np.zeros_like(rhs) if self.guess is None or self.guess.shape != rhs.shape else self.guess.copy()
+        dv[system.fixed] = 0
+        residual = rhs - self.product(system, dv, dt, damping)
+        z = inverse * residual
+        direction = z.copy()
+        rz = float(np.vdot(residual, z))
+        threshold = self.tolerance ** 2 * max(float(np.vdot(rhs, rhs)), np.finfo(float).tiny)
+
+        iteration = 0
+        while iteration < self.iterations and float(np.vdot(residual, residual)) > threshold:
+            Ad = self.product(system, direction, dt, damping)
+            alpha = rz / float(np.vdot(direction, Ad))
+            dv += alpha * direction
+            residual -= alpha * Ad
+            z = inverse * residual
+            rz, previous = float(np.vdot(residual, z)), rz
+            direction = z + (rz / previous) * direction
+            iteration += 1
+        self.last_iterations = iteration
+        self.guess = dv
+
+        # Update Velocities and Positions, keeping prev_pos valid for Verlet
+        free = ~system.fixed
+        system.vel[free] += dv[free]
+        system.prev_pos[free] = system.pos[free]
+        system.pos[free] += dt * system.vel[free]
+        system.acc[:] = 0
@@ -1,9 +1,5 @@
-from vpython import *
 import argparse
 import logging
-from point import Point 
-from constraint import Spring 
-from simulation import Simulation
 
 # Use Numba - Cannot work with this library
 # Fix Argparse with default values
@@ -21,7 +17,23 @@ if __name__ == "__main__":
         Setting up Argument Parsing using argparse 
 
         I only read the type of simulation to run (rope default), the integration method that has
-        to be used (Verlet default) and the timestep (0.01 default)
+        to be used (Verlet default, RK1 or Implicit backward Euler) and the timestep (0.01 default).
+        --engine xpbd replaces Spring Forces with XPBD Distance Constraints projected --iterations times. With --headless the simulation
+        runs without vpython for --steps steps (or --time seconds of simulated time) and the final
+        state can be written to an .npz file with --output. The sheet type generates a cloth of
+        --width x --height points, optionally with --shear and --bend springs. --checkpoint writes
+        the full state every --checkpoint-every steps and --resume continues from such a file.
+        --profile writes per-phase timings and counters as JSON; with --debug a summary is logged every
+        --summary-every steps and cProfile/tracemalloc capture --profile-steps steps from --profile-start.
+        --threads splits the Spring Forces and the Integration of the force engine over that many threads,
+        and springs stretched beyond the --tear strain (0.5 means 50% longer than at rest) break.
+        Every --obstacle (sphere:cx,cy,cz,r box:cx,cy,cz,hx,hy,hz plane:px,py,pz,nx,ny,nz
+        capsule:ax,ay,az,bx,by,bz,r heightfield:heights.npy,ox,oy,oz,spacing) is a static shape the cloth
+        collides with, using --obstacle-friction and --restitution. With --sleep SPEED, islands of the cloth whose
+        nodes stay slower than SPEED (and barely accelerate) for --sleep-steps steps are skipped until disturbed.
+        --serve PORT streams the positions --serve-rate times per second over a local WebSocket (float16 or
+        delta --encoding) and accepts run/stop, grab/drag/release and delete control messages; a headless run
+        served this way keeps real time and only stops after --steps or --time if one is given
     """
     parser = argparse.ArgumentParser(
         prog='Cloth Simulation',
@@ -29,13 +41,53 @@ if __name__ == "__main__":
         epilog='Check out the Readme file to have a clear and thorough understanding of how to use the script'
     )
     parser.add_argument('-t', '--type', default = 'rope')
-    parser.add_argument('-i', '--integration', default = 'Verlet')
+    parser.add_argument('-i', '--integration', choices = ['Verlet', 'RK1', 'Implicit'], default = 'Verlet')
+    parser.add_argument('-e', '--engine', choices = ['force', 'xpbd'], default = 'force')
+    parser.add_argument('--iterations', type = int, default = 10)
+    parser.add_argument('--solver', choices = ['gauss-seidel', 'jacobi'], default = 'gauss-seidel')
+    parser.add_argument('--threads', type = int, default = 1)
+    parser.add_argument('--tear', type = float)
+    parser.add_argument('--obstacle', action = 'append', default = [])
+    parser.add_argument('--obstacle-friction', type = float, default = 0.5)
+    parser.add_argument('--restitution', type = float, default = 0)
+    parser.add_argument('--sleep', type = float)
+    parser.add_argument('--sleep-steps', type = int, default = 60)
+    parser.add_argument('--serve', type = int)
+    parser.add_argument('--serve-rate', type = float, default = 30)
+    parser.add_argument('--encoding', choices = ['float16', 'delta'], default = 'float16')
     parser.add_argument('-dt', '--deltatime', type = float, default = 0.01)
     parser.add_argument('-f', '--friction', action = 'store_true', default = False)
     parser.add_argument('-d', '--debug', action = 'store_true')
     parser.add_argument('-gx', '--gravityx', type = float);
     parser.add_argument('-gy', '--gravityy', type = float);
     parser.add_argument('-gz', '--gravityz', type = float);
+    parser.add_argument('--width', type = int, default = 20)
+    parser.add_argument('--height', type = int, default = 20)
+    parser.add_argument('--spacing', type = float, default = 0.5)
+    parser.add_argument('--shear', action = 'store_true')
+    parser.add_argument('--bend', action = 'store_true')
+    parser.add_argument('--energy-interval', type = int, default = 10)
+    parser.add_argument('--thickness', type = float)
+    parser.add_argument('--adaptive', action = 'store_true')
+    parser.add_argument('--record')
+    parser.add_argument('--record-stride', type = int, default = 1)
+    parser.add_argument('--record-velocities', action = 'store_true')
+    parser.add_argument('--record-energies', action = 'store_true')
+    parser.add_argument('--replay')
+    parser.add_argument('--speed', type = float, default = 1)
+    parser.add_argument('--fps', type = float, default = 30)
+    parser.add_argument('--render', choices = ['objects', 'batched'], default = 'objects')
+    parser.add_argument('--checkpoint')
+    parser.add_argument('--checkpoint-every', type = int, default = 1000)
+    parser.add_argument('--resume')
+    parser.add_argument('--profile')
+    parser.add_argument('--profile-start', type = int)
+    parser.add_argument('--profile-steps', type = int, default = 100)
+    parser.add_argument('--summary-every', type = int, default = 500)
+    parser.add_argument('--headless', action = 'store_true')
+    parser.add_argument('--steps', type = int)
+    parser.add_argument('--time', type = float)
+    parser.add_argument('-o', '--output')
     args = parser.parse_args()
 
     simulation_object = args.type       # Object that is Simulated (e.g. rope, cloth)
@@ -48,9 +100,9 @@ if __name__ == "__main__":
     gravity_y = args.gravityy
     gravity_z = args.gravityz
     if (gravity_x is None and gravity_y is None and gravity_z is None):
-        gravity = vector(0, -9.81, 0)
+        gravity = (0, -9.81, 0)
     else:
-        gravity = vector(
+        gravity = (
             0 if gravity_x is None else gravity_x,
             0 if gravity_y is None else gravity_y,
             0 if gravity_z is None else gravity_z
@@ -64,24 +116,89 @@ if __name__ == "__main__":
 
 
 
+    """
+        Replaying a recorded Trajectory (--replay), without building any Simulation
+    """
+    if args.replay is not None:
+        from replay import Replay
+        Replay(args.replay, speed = args.speed, fps = args.fps).run()
+        raise SystemExit
+
+
+
+
     """
         Setting up the Simulation 
+
+        The Simulation (and numpy with it) is only imported once the Arguments are parsed,
+        so --help and Argument Errors answer right away
     """
-    sim = Simulation(
-        elasticity = 1000, 
-        mass = 10, 
-        friction = friction, 
-        gravity = gravity, 
-        dt = dt, 
-        integration = integration 
+    from simulation import Simulation
+    from profiling import Profiler
+    if args.obstacle:
+        from obstacles import parse_obstacle
+        obstacles = [parse_obstacle(description, friction = args.obstacle_friction, restitution = args.restitution) for description in args.obstacle]
+    else:
+        obstacles = None
+    options = dict(
+        headless = args.headless,
+        steps = args.steps if args.steps is not None or args.time is not None or args.serve is not None else 1000,
+        duration = args.time,
+        output = args.output,
+        energy_interval = args.energy_interval,
+        thickness = args.thickness,
+        adaptive = args.adaptive,
+        render = args.render,
+        fps = args.fps,
+        engine = args.engine,
+        iterations = args.iterations,
+        solver = args.solver,
+        threads = args.threads,
+        tearing = args.tear,
+        obstacles = obstacles,
+        sleep = args.sleep,
+        sleep_steps = args.sleep_steps,
+        serve = args.serve,
+        serve_rate = args.serve_rate,
+        encoding = args.encoding,
+        profiler = Profiler(
+            summary_every = args.summary_every if args.debug else 0,
+            capture_start = args.profile_start if args.profile_start is not None else (1 if args.profile is not None and args.debug else None),
+            capture_steps = args.profile_steps
+        ),
+        profile_path = args.profile
     )
+    if args.resume is not None:
+        sim = Simulation.from_checkpoint(args.resume, **options)
+    else:
+        sim = Simulation(
+            elasticity = 1000, 
+            mass = 10, 
+            friction = friction, 
+            gravity = gravity, 
+            dt = dt, 
+            integration = integration,
+            **options
+        )
+    if args.record is not None:
+        sim.record(args.record, args.record_stride, args.record_velocities, args.record_energies)
+    if args.checkpoint is not None:
+        sim.checkpoint(args.checkpoint, args.checkpoint_every)
+
     match simulation_object:
+        case _ if args.resume is not None:
+            state = sim.run()
         case 'grid':
-            sim.grid()
+            state = sim.grid()
         case 'cloth':
-            sim.cloth1()
+            state = sim.cloth1()
         case 'cloth2':
-            sim.cloth2()
+            state = sim.cloth2()
+        case 'sheet':
+            state = sim.sheet(args.width, args.height, args.spacing, args.shear, args.bend)
         case _:
-            sim.rope()
+            state = sim.rope()
+
+    # Only reached in Headless Mode
+    logging.warning(f"Simulated {state['t']:.3f}s with {len(state['pos'])} points and {len(state['node1'])} springs")
 
@@ -0,0 +1,254 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from engine import ParticleSystem
+
+# Normal used where the Direction is undefined (a Particle exactly on a Center or Axis)
+UP = np.array((0.0, 1.0, 0.0))
+
+
+# Unit Vectors along every Row, UP where a Row has no Length
+def normalize(vectors: np.ndarray) -> tuple:
+    length = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+    safe = length > np.finfo(float).tiny
+    unit = np.where(safe[:, None], vectors / np.where(safe, length, 1)[:, None], UP)
+    return unit, length
+
+
+class Obstacle(ABC):
+
+    __slots__ = ('friction', 'restitution')
+
+    def __init__(self, friction: float = 0.5, restitution: float = 0.0) -> None:
+
+        # Variable Declaration
+        self.friction = friction        # Coulomb Coefficient, the tangential Speed lost per unit of normal Speed lost
+        self.restitution = restitution  # Fraction of the normal Speed given back after a Contact
+
+    # Axis-Aligned Bounding Box (low, high) of the Obstacle, infinite Sides are allowed
+    @abstractmethod
+    def bounds(self) -> tuple:
+        ...
+
+    # Signed Distance of every Position (negative inside) and the outward Normal there
+    @abstractmethod
+    def distance(self, pos: np.ndarray) -> tuple:
+        ...
+
+
+class Sphere(Obstacle):
+
+    __slots__ = ('center', 'radius')
+
+    def __init__(self, center: np.ndarray, radius: float, **material) -> None:
+        super().__init__(**material)
+        self.center = np.asarray(center, dtype = float)
+        self.radius = radius
+
+    def bounds(self) -> tuple:
+        return self.center - self.radius, self.center + self.radius
+
+    def distance(self, pos: np.ndarray) -> tuple:
+        normal, length = normalize(pos - self.center)
+        return length - self.radius, normal
+
+
+class Box(Obstacle):
+
+    __slots__ = ('center', 'half')
+
+    # Axis-aligned Box given by its Center and Half Extents
+    def __init__(self, center: np.ndarray, half: np.ndarray, **material) -> None:
+        super().__init__(**material)
+        self.center = np.asarray(center, dtype = float)
+        self.half = np.asarray(half, dtype = float)
+
+    def bounds(self) -> tuple:
+        return self.center - self.half, self.center + self.half
+
+    def distance(self, pos: np.ndarray) -> tuple:
+
+        local = pos - self.center
+        side = np.where(local < 0, -1.0, 1.0)
+        q = np.abs(local) - self.half
+
+        # Outside: Distance to the nearest Point of the Surface; Inside: to the closest Face
+        outward, outside = normalize(np.maximum(q, 0))
+        face = np.argmax(q, axis = 1)
+        inside = np.minimum(q[np.arange(len(q)), face], 0)
+        face_normal = np.zeros_like(q)
+        face_normal[np.arange(len(q)), face] = 1
+        normal = np.where((outside > 0)[:, None], outward, face_normal) * side
+        return outside + inside, normal
+
+
+class Plane(Obstacle):
+
+    __slots__ = ('point', 'normal')
+
+    # Half-Space behind a Plane through point, facing normal
+    def __init__(self, point: np.ndarray, normal: np.ndarray, **material) -> None:
+        super().__init__(**material)
+        self.point = np.asarray(point, dtype = float)
+        self.normal = np.asarray(normal, dtype = float) / np.linalg.norm(normal)
+
+    def bounds(self) -> tuple:
+
+        # Only an axis-aligned Plane bounds its Half-Space on one Side
+        low, high = np.full(3, -np.inf), np.full(3, np.inf)
+        axis = np.flatnonzero(np.abs(self.normal) == 1)
+        for a in axis:
+            if self.normal[a] > 0:
+                high[a] = self.point[a]
+            else:
+                low[a] = self.point[a]
+        return low, high
+
+    def distance(self, pos: np.ndarray) -> tuple:
+        return (pos - self.point) @ self.normal, np.broadcast_to(self.normal, pos.shape)
+
+
+class Capsule(Obstacle):
+
+    __slots__ = ('start', 'end', 'radius')
+
+    # Points within radius of the Segment from start to end
+    def __init__(self, start: np.ndarray, end: np.ndarray, radius: float, **material) -> None:
+        super().__init__(**material)
+        self.start = np.asarray(start, dtype = float)
+        self.end = np.asarray(end, dtype = float)
+        self.radius = radius
+
+    def bounds(self) -> tuple:
+        return np.minimum(self.start, self.end) - self.radius, np.maximum(self.start, self.end) + self.radius
+
+    def distance(self, pos: np.ndarray) -> tuple:
+        axis = self.end - self.start
+        along = np.clip((pos - self.start) @ axis / max(float(axis @ axis), np.finfo(float).tiny), 0, 1)
+        normal, length = normalize(pos - self.start - along[:, None] * axis)
+        return length - self.radius, normal
+
+
+class Heightfield(Obstacle):
+
+    __slots__ = ('origin', 'spacing', 'heights')
+
+    # Ground y = origin.y + heights[row, column] over the Grid x = origin.x + column * spacing, z = origin.z + row * spacing,
+    # solid below the Surface
+    def __init__(self, origin: np.ndarray, spacing: float, heights: np.ndarray, **material) -> None:
+        super().__init__(**material)
+        self.origin = np.asarray(origin, dtype = float)
+        self.spacing = spacing
+        self.heights = np.asarray(heights, dtype = float)
+
+    def bounds(self) -> tuple:
+        rows, columns = self.heights.shape
+        low = np.array((self.origin[0], -np.inf, self.origin[2]))
+        high = self.origin + ((columns - 1) * self.spacing, self.heights.max(), (rows - 1) * self.spacing)
+        return low, high
+
+    def distance(self, pos: np.ndarray) -> tuple:
+
+        rows, columns = self.heights.shape
+        u = (pos[:, 0] - self.origin[0]) / self.spacing
+        w = (pos[:, 2] - self.origin[2]) / self.spacing
+        over = (u >= 0) & (u <= columns - 1) & (w >= 0) & (w <= rows - 1)
+
+        # Bilinear Height and its Slope inside the Cell under every Position
+        column = np.clip(np.floor(u).astype(np.intp), 0, max(columns - 2, 0))
+        row = np.clip(np.floor(w).astype(np.intp), 0, max(rows - 2, 0))
+        fu, fw = np.clip(u - column, 0, 1), np.clip(w - row, 0, 1)
+        next_column, next_row = np.minimum(column + 1, columns - 1), np.minimum(row + 1, rows - 1)
+        h00, h01 = self.heights[row, column], self.heights[row, next_column]
+        h10, h11 = self.heights[next_row, column], self.heights[next_row, next_column]
+        height = (1 - fw) * ((1 - fu) * h00 + fu * h01) + fw * ((1 - fu) * h10 + fu * h11)
+        slope_x = ((1 - fw) * (h01 - h00) + fw * (h11 - h10)) / self.spacing
+        slope_z = ((1 - fu) * (h10 - h00) + fu * (h11 - h01)) / self.spacing
+
+        # Vertical Gap projected on the Normal, Positions off the Grid never touch
+        normal, length = normalize(np.stack((-slope_x, np.ones_like(slope_x), -slope_z), axis = 1))
+        phi = np.where(over, (pos[:, 1] - self.origin[1] - height) / length, np.inf)
+        return phi, normal
+
+
+class Obstacles:
+
+    __slots__ = ('obstacles', 'thickness')
+
+    def __init__(self, obstacles: list, thickness: float = 0.05) -> None:
+
+        # Variable Declaration
+        self.obstacles = obstacles      # Static Shapes the Cloth collides with
+        self.thickness = thickness      # Distance kept between the Particles and every Surface
+
+    # Every free Particle touching an Obstacle is pushed out to its Surface, and its Velocity loses the approaching
+    # normal Part (given back times the Restitution) and the tangential Part Friction takes, returns the Contacts
+    def resolve(self, system: ParticleSystem, dt: float) -> int:
+
+        free = ~system.fixed
+        if not free.any():
+            return 0
+        pos = system.pos
+        low, high = pos[free].min(axis = 0) - self.thickness, pos[free].max(axis = 0) + self.thickness
+
+        contacts = 0
+        for obstacle in self.obstacles:
+
+            # Broad Phase: Obstacles whose Box misses the Cloth Box are skipped, then Particles outside the Obstacle Box
+            first, last = obstacle.bounds()
+            if (first > high).any() or (last < low).any():
+                continue
+            near = free & np.all((pos >= first - self.thickness) & (pos <= last + self.thickness), axis = 1)
+            index = np.flatnonzero(near)
+            if len(index) == 0:
+                continue
+            phi, normal = obstacle.distance(pos[index])
+            touching = phi < self.thickness
+            index, phi, normal = index[touching], phi[touching], normal[touching]
+            if len(index) == 0:
+                continue
+
+            # Position back on the Surface
+            pos[index] += (self.thickness - phi)[:, None] * normal
+
+            # Velocity split along the Normal: approaching Speed is reflected and scaled, tangential Speed shrinks by Friction
+            vel = system.vel[index]
+            speed = np.einsum('ij,ij->i', vel, normal)
+            tangent = vel - speed[:, None] * normal
+            tangent_speed = np.sqrt(np.einsum('ij,ij->i', tangent, tangent))
+            lost = (1 + obstacle.restitution) * np.maximum(-speed, 0)
+            taken = np.minimum(obstacle.friction * lost, tangent_speed)     # Friction stops the Particle at most
+            scale = 1 - np.divide(taken, tangent_speed, out = np.zeros_like(tangent_speed), where = tangent_speed > 0)
+            speed = np.where(speed < 0, -obstacle.restitution * speed, speed)
+            vel = scale[:, None] * tangent + speed[:, None] * normal
+
+            # prev_pos follows, so Verlet sees the same Velocity
+            system.vel[index] = vel
+            system.prev_pos[index] = pos[index] - dt * vel
+            contacts += len(index)
+        return contacts
+
+
+# Obstacle from a Command Line Description, Numbers separated by Commas after the Shape:
+# sphere:cx,cy,cz,r  box:cx,cy,cz,hx,hy,hz  plane:px,py,pz,nx,ny,nz  capsule:ax,ay,az,bx,by,bz,r
+# heightfield:file.npy,ox,oy,oz,spacing
+def parse_obstacle(description: str, **material) -> Obstacle:
+
+    shape, _, arguments = description.partition(':')
+    values = arguments.split(',')
+    match shape:
+        case 'sphere':
+            v = [float(x) for x in values]
+            return Sphere(v[0:3], v[3], **material)
+        case 'box':
+            v = [float(x) for x in values]
+            return Box(v[0:3], v[3:6], **material)
+        case 'plane':
+            v = [float(x) for x in values]
+            return Plane(v[0:3], v[3:6], **material)
+        case 'capsule':
+            v = [float(x) for x in values]
+            return Capsule(v[0:3], v[3:6], v[6], **material)
+        case 'heightfield':
+            v = [float(x) for x in values[1:]]
+            return Heightfield(v[0:3], v[3], np.load(values[0]), **material)
+    raise ValueError(f"Unknown obstacle '{description}'")
@@ -0,0 +1,133 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from engine import ParticleSystem, spring_forces
+
+
+class Partition:
+
+    __slots__ = ('block', 'start', 'end', 'force', 'elastic')
+
+    def __init__(self, block: slice, start: int, end: int) -> None:
+
+        # Variable Declaration
+        self.block = block                          # Nodes the Springs touch (every Node for the Boundary)
+        self.start = start                          # First Row of the Springs in the System
+        self.end = end                              # Row after the last one
+        self.force = np.zeros((2, end - start, 3))  # Reused by every Pass, a Partition only shrinks
+        self.elastic = 0.0                          # Elastic Energy of the last Pass
+
+    def evaluate(self, system: ParticleSystem) -> None:
+
+        start, end = self.start, self.end
+        if start == end:
+            self.elastic = 0.0
+            return
+
+        # The Springs are a contiguous Range of Rows, so the System Buffers are filled in place and need no Copy back
+        rows = slice(start, end)
+        force = self.force[:, :end - start]
+        self.elastic = spring_forces(system.pos, system.node1[rows], system.node2[rows], system.length[rows], system.elasticity[rows],
+                                     system.displacement[rows], system.distance[rows], system.deformation[rows], force)
+
+        # Sum of the Forces on the Nodes of the Block (bincount releases the GIL, so Blocks are summed concurrently)
+        first, last = 3 * self.block.start, 3 * self.block.stop
+        total = np.bincount(system.scatter[0, 3 * start:3 * end], force[0].ravel(), last)
+        total += np.bincount(system.scatter[1, 3 * start:3 * end], force[1].ravel(), last)
+        total = total[first:].reshape(-1, 3)
+        total *= system.inv_mass[self.block, None]
+        system.acc[self.block] += total
+
+
+class ParallelSystem:
+
+    __slots__ = ('workers', 'pool', 'system', 'springs_num', 'blocks', 'partitions', 'boundary')
+
+    def __init__(self, workers: int) -> None:
+
+        # Variable Declaration
+        self.workers = workers          # Threads sharing the Constraint and Integration Passes
+        self.pool = ThreadPoolExecutor(workers)
+        self.system = None              # System the Partitions were built for
+        self.springs_num = None
+        self.blocks = []                # Contiguous Ranges of Nodes, one per Worker
+        self.partitions = []            # Springs with both Nodes inside the same Block
+        self.boundary = None            # Springs crossing two Blocks
+
+    # Block of every Spring, the Workers Count for the Springs crossing two Blocks
+    def keys(self, system: ParticleSystem) -> np.ndarray:
+        size = max(-(-system.points_num // self.workers), 1)
+        block1, block2 = system.node1 // size, system.node2 // size
+        return np.where(block1 == block2, block1, self.workers)
+
+    # Domain Decomposition: Nodes are split in contiguous Blocks, and Springs inside one Block share no Node
+    # with the Springs of another, so the Blocks accumulate their Forces concurrently without Races.
+    # The Springs are sorted by Block once (the Simulation does it before binding its Views), so every Partition is a Range of Rows
+    def prepare(self, system: ParticleSystem) -> None:
+
+        if self.system is system and self.springs_num == system.springs_num:
+            return
+
+        size = max(-(-system.points_num // self.workers), 1)
+        self.blocks = [slice(start, min(start + size, system.points_num)) for start in range(0, system.points_num, size)]
+        keys = self.keys(system)
+        if np.any(keys[1:] < keys[:-1]):
+            order = np.argsort(keys, kind = 'stable')
+            system.reorder_springs(order)
+            keys = keys[order]
+        bounds = np.searchsorted(keys, np.arange(self.workers + 2)).tolist()
+        self.partitions = [Partition(block, bounds[number], bounds[number + 1]) for number, block in enumerate(self.blocks)]
+
+        # Crossing Springs touch two Blocks, so they are added once every Block is done (few on Grids, whose Rows are contiguous)
+        self.boundary = Partition(slice(0, system.points_num), bounds[-2], bounds[-1])
+        self.system = system
+        self.springs_num = system.springs_num
+
+    # Removes a Spring keeping every Partition a Range of Rows: the last Row of its Partition takes its Place, then every
+    # later Partition hands its last Row to the Row freed just before it, so a Removal moves one Row per Partition at most.
+    # Returns the Moves as (source, target) Pairs
+    def remove_spring(self, system: ParticleSystem, index: int) -> list:
+
+        own = self.system is system and self.springs_num == system.springs_num
+        ranges = self.partitions + [self.boundary]
+        if own:
+            ends = [partition.end for partition in ranges]
+        else:
+            ends = np.searchsorted(self.keys(system), np.arange(1, self.workers + 2)).tolist()
+
+        moves, hole = [], index
+        for number, end in enumerate(ends):
+            if end <= index:
+                continue
+            if end - 1 > hole:
+                moves.append((end - 1, hole))
+                system.move_spring(end - 1, hole)
+            hole = end - 1
+            ends[number] = end - 1
+        system.remove_spring(hole)
+
+        if own:
+            for number, partition in enumerate(ranges):
+                partition.start = ends[number - 1] if number else 0
+                partition.end = ends[number]
+            self.springs_num = system.springs_num
+        return moves
+
+    def apply_constraints(self, system: ParticleSystem) -> None:
+
+        self.prepare(system)
+        list(self.pool.map(lambda partition: partition.evaluate(system), self.partitions))
+        self.boundary.evaluate(system)
+        system.elastic = sum(partition.elastic for partition in self.partitions) + self.boundary.elastic
+
+    # Gravity and Integration only touch the Nodes of their own Block
+    def integrate(self, system: ParticleSystem, dt: float, g: np.ndarray, integration: str = 'Verlet') -> None:
+
+        def advance(block: slice) -> None:
+            system.acc[block] += g
+            system.integrate(dt, integration, block)
+
+        self.prepare(system)
+        list(self.pool.map(advance, self.blocks))
+
+    def close(self) -> None:
+        self.pool.shutdown()
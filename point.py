@@ -1,10 +1,15 @@
-from vpython import vector, sphere, color
+import numpy as np
+from engine import ParticleSystem, to_array
 
 class Point:
 
-    __slots__ = ('pos', 'first_pos', 'prev_pos', 'mass', 'fixed', 'vel', 'acc', 'friction', 'object', 'integration')
+    __slots__ = ('system', 'index', 'object', 'integration')
 
-    def __init__(self, pos: vector, mass: float, friction: float = 1, fixed: bool = False, integration: str = 'Verlet') -> None:
+    def __init__(self, pos: np.ndarray, mass: float, friction: float = 1, fixed: bool = False, integration: str = 'Verlet') -> None:
+
+        # Until the Simulation gathers it, the Node lives in a System of its own
+        self.system = ParticleSystem(1)     # Arrays Storing the State of the Node
+        self.index = 0                      # Row of the Node inside the System
 
         # Variable Declaration
         self.pos = pos               # Position of the Node
@@ -12,28 +17,100 @@ class Point:
         self.prev_pos = pos          # Used for Numerical Integration
         self.mass = mass             # Mass of the Node
         self.fixed = fixed           # Determines whether the Node is Fixed
-        self.vel = vector(0, 0, 0)   # Velocity of the Node
-        self.acc = vector(0, 0, 0)   # Acceleration of the Node
         self.friction = friction     # Adds Friction if required
         self.integration = integration      # Method Used for Numerical Integration
+        self.object = None           # Sphere Rendering the Node (set by the Renderer)
+
+    # Creates a Node viewing a Row of an existing System
+    @classmethod
+    def view(cls, system: ParticleSystem, index: int, integration: str = 'Verlet') -> 'Point':
+        point = cls.__new__(cls)
+        point.system = system
+        point.index = index
+        point.integration = integration
+        point.object = None
+        return point
+
+    # Turns the Node into a View over a Row of another System
+    def bind(self, system: ParticleSystem, index: int) -> None:
+        self.system = system
+        self.index = index
+
+    @property
+    def pos(self) -> np.ndarray:
+        return self.system.pos[self.index]
+
+    @pos.setter
+    def pos(self, value) -> None:
+        self.system.pos[self.index] = to_array(value)
+
+    @property
+    def first_pos(self) -> np.ndarray:
+        return self.system.first_pos[self.index]
+
+    @first_pos.setter
+    def first_pos(self, value) -> None:
+        self.system.first_pos[self.index] = to_array(value)
+
+    @property
+    def prev_pos(self) -> np.ndarray:
+        return self.system.prev_pos[self.index]
+
+    @prev_pos.setter
+    def prev_pos(self, value) -> None:
+        self.system.prev_pos[self.index] = to_array(value)
+
+    @property
+    def vel(self) -> np.ndarray:
+        return self.system.vel[self.index]
 
-        # Rendering the Node with a Sphere
-        self.object = sphere(
-            pos = pos,          # Position of the Node
-            radius = 0.1,         # Radius of the Node
-            color = color.red   # Color of the Node
-        )
+    @vel.setter
+    def vel(self, value) -> None:
+        self.system.vel[self.index] = to_array(value)
 
-    def add_force(self, force: vector) -> None:
-        self.acc += force / self.mass   # Simply Computing Acceleration From Force
+    @property
+    def acc(self) -> np.ndarray:
+        return self.system.acc[self.index]
+
+    @acc.setter
+    def acc(self, value) -> None:
+        self.system.acc[self.index] = to_array(value)
+
+    @property
+    def mass(self) -> float:
+        return float(self.system.mass[self.index])
+
+    @mass.setter
+    def mass(self, value: float) -> None:
+        self.system.mass[self.index] = value
+        self.system.inv_mass[self.index] = 1 / value
+
+    @property
+    def fixed(self) -> bool:
+        return bool(self.system.fixed[self.index])
+
+    @fixed.setter
+    def fixed(self, value: bool) -> None:
+        self.system.fixed[self.index] = value
+
+    @property
+    def friction(self) -> float:
+        return float(self.system.friction[self.index])
+
+    @friction.setter
+    def friction(self, value: float) -> None:
+        self.system.friction[self.index] = value
+
+    def add_force(self, force: np.ndarray) -> None:
+        self.acc += to_array(force) / self.mass   # Simply Computing Acceleration From Force
 
     def kinetic_energy(self) -> float:
-        return 1 / 2 * self.mass * self.vel.mag ** 2
+        return 1 / 2 * self.mass * float(np.dot(self.vel, self.vel))
 
-    def gravitational_energy(self, g: vector) -> float:
-        return -self.mass * g.dot(self.pos - self.first_pos)
+    def gravitational_energy(self, g: np.ndarray) -> float:
+        return -self.mass * float(np.dot(to_array(g), self.pos - self.first_pos))
 
-    # Updates Position doing Numerical Integration and Renders the Node
+    # Updates Position doing Numerical Integration
     def update(self, dt: float) -> None:
 
         # If the point is fixed the position won't be updated
@@ -52,11 +129,8 @@ class Point:
             case _:
                 disp = self.pos - self.prev_pos
                 self.vel = disp / dt
-                self.acc -= self.friction * self.vel 
+                self.acc -= self.friction * self.vel
                 self.pos = 2 * self.pos - self.prev_pos + self.acc * dt ** 2
                 self.prev_pos = disp + self.prev_pos
 
-        self.acc = vector(0, 0, 0)
-
-        # Rendering the Node
-        self.object.pos = self.pos
+        self.acc = (0, 0, 0)
@@ -0,0 +1,130 @@
+import json
+import logging
+import time
+
+
+class Phase:
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+
+    __slots__ = ('timers', 'calls', 'counters', 'phases', 'steps', 'summary_every', 'window', 'capture_start', 'capture_steps', 'profile', 'capture')
+
+    def __init__(self, summary_every: int = 0, capture_start: int = None, capture_steps: int = 100) -> None:
+
+        # Variable Declaration
+        self.timers = {}                    # Total Seconds spent in every Phase
+        self.calls = {}                     # Times every Phase was entered
+        self.counters = {}                  # Named Counters (Steps, Springs, Allocations, ...)
+        self.phases = {}                    # Reusable Phase Objects, so timing a Phase allocates nothing
+        self.steps = 0                      # Steps ended so far
+        self.summary_every = summary_every  # Steps between two logged Summaries, 0 never logs
+        self.window = {}                    # Timers at the last Summary, so Summaries cover one Window each
+
+        # Optional cProfile / tracemalloc Capture over a Window of Steps
+        self.capture_start = capture_start
+        self.capture_steps = capture_steps
+        self.profile = None
+        self.capture = None                 # Result of the Capture once it is over
+
+    def phase(self, name: str) -> Phase:
+        if name not in self.phases:
+            self.phases[name] = Phase(self, name)
+        return self.phases[name]
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: int) -> None:
+        self.counters[name] = value
+
+    # Called once per Step: opens and closes the Capture Window and logs periodic Summaries
+    def end_step(self) -> None:
+
+        self.steps += 1
+        self.counters['steps'] = self.steps
+
+        if self.capture_start is not None:
+            if self.steps == self.capture_start:
+                self.start_capture()
+            elif self.steps == self.capture_start + self.capture_steps:
+                self.stop_capture()
+
+        if self.summary_every and self.steps % self.summary_every == 0:
+            logging.debug(self.summary())
+
+    # The Capture Modules are only imported when a Capture is asked for
+    def start_capture(self) -> None:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop_capture(self) -> None:
+
+        if self.profile is None:
+            return
+        import io
+        import pstats
+        import tracemalloc
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Allocation Sites still holding Memory, and the Functions taking the most Time
+        statistics = snapshot.statistics('lineno')
+        self.counters['allocations'] = sum(stat.count for stat in statistics)
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream = stream).sort_stats('cumulative').print_stats(20)
+        self.capture = {
+            'first_step': self.capture_start,
+            'steps': self.steps - self.capture_start,
+            'traced_memory': current,
+            'peak_memory': peak,
+            'allocation_sites': [{'site': str(stat.traceback), 'size': stat.size, 'count': stat.count} for stat in statistics[:20]],
+            'functions': stream.getvalue()
+        }
+        self.profile = None
+
+    # Time per Phase since the last Summary
+    def summary(self) -> str:
+
+        parts = []
+        for name, seconds in self.timers.items():
+            window = seconds - self.window.get(name, 0.0)
+            parts.append(f"{name} {1000 * window:.1f}ms")
+        self.window = dict(self.timers)
+        counters = ', '.join(f"{name} {value}" for name, value in self.counters.items())
+        return f"step {self.steps}: {', '.join(parts)} | {counters}"
+
+    def report(self) -> dict:
+        return {
+            'steps': self.steps,
+            'phases': {name: {'seconds': seconds, 'calls': self.calls[name], 'mean': seconds / self.calls[name]} for name, seconds in self.timers.items()},
+            'counters': self.counters,
+            'capture': self.capture
+        }
+
+    def dump(self, path: str) -> None:
+        self.stop_capture()
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent = 2)
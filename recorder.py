@@ -0,0 +1,171 @@
+import json
+import queue
+import struct
+import threading
+import numpy as np
+from engine import ParticleSystem
+
+# File Layout: magic, header length, JSON header, topology (Springs, Fixed Nodes and Builder Order, written once), then fixed-size frames
+MAGIC = b'CLTHTRJ1'
+ALIGNMENT = 64
+
+
+# Layout of one Frame: only the Fields that were asked for are stored, plus which recorded Springs are still there
+# (one Bit per Spring of the Topology, as Springs break or get deleted during the Run)
+def frame_dtype(points_num: int, velocities: bool, energies: bool, springs_num: int = None) -> np.dtype:
+
+    fields = [('t', '<f8'), ('pos', '<f4', (points_num, 3))]
+    if springs_num is not None:
+        fields.append(('springs', 'u1', (-(-springs_num // 8),)))
+    if velocities:
+        fields.append(('vel', '<f4', (points_num, 3)))
+    if energies:
+        fields.append(('energy', '<f4', (4,)))     # Kinetic, Gravitational, Elastic, Total
+    return np.dtype(fields)
+
+
+class TrajectoryWriter:
+
+    __slots__ = ('file', 'stride', 'gravity', 'dtype', 'chunk', 'filled', 'steps', 'frames', 'keys', 'springs_num', 'alive', 'pending', 'thread')
+
+    def __init__(self, path: str, system: ParticleSystem, stride: int = 1, velocities: bool = False, energies: bool = False,
+                 gravity: np.ndarray = None, dt: float = None, chunk_frames: int = 64, order: np.ndarray = None) -> None:
+
+        # Variable Declaration
+        self.file = open(path, 'wb')
+        self.stride = max(1, stride)            # Steps between two recorded Frames
+        self.gravity = gravity                  # Needed for the Gravitational Energy
+        self.dtype = frame_dtype(system.points_num, velocities, energies, system.springs_num)
+        self.chunk = np.zeros(chunk_frames, dtype = self.dtype)     # Frames waiting to be written
+        self.filled = 0                         # Frames in the current Chunk
+        self.steps = 0                          # Steps seen so far
+        self.frames = 0                         # Frames recorded so far
+
+        # Recorded Springs are told apart by their Nodes (Swap-Removes reorder the Springs, never their Nodes)
+        self.keys = system.node1.astype(np.int64) * system.points_num + system.node2
+        self.springs_num = system.springs_num   # Springs the Mask was computed for
+        self.alive = np.packbits(np.ones(system.springs_num, dtype = bool))
+
+        # Header and Topology are written once, Frames follow aligned
+        header = json.dumps({
+            'points_num': system.points_num,
+            'springs_num': system.springs_num,
+            'stride': self.stride,
+            'dt': dt,
+            'velocities': velocities,
+            'energies': energies,
+            'springs_mask': True,
+            'order': order is not None
+        }).encode()
+        topology = system.node1.astype('<i4').tobytes() + system.node2.astype('<i4').tobytes() + system.fixed.astype('u1').tobytes()
+        if order is not None:
+            topology += np.asarray(order).astype('<i4').tobytes()      # Builder Index of every recorded Node
+        preamble = MAGIC + struct.pack('<Q', len(header)) + header + topology
+        self.file.write(preamble + bytes(-len(preamble) % ALIGNMENT))
+
+        # Disk Writes happen on a Thread, so the Step Loop only copies Frames into the Chunk
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target = self.write_chunks, daemon = True)
+        self.thread.start()
+
+    def write_chunks(self) -> None:
+        while (chunk := self.pending.get()) is not None:
+            self.file.write(chunk.tobytes())
+
+    # Called once per Step, only records every stride Steps
+    def record(self, t: float, system: ParticleSystem) -> None:
+
+        self.steps += 1
+        if (self.steps - 1) % self.stride:
+            return
+
+        frame = self.chunk[self.filled]
+        frame['t'] = t
+        frame['pos'] = system.pos
+        if system.springs_num != self.springs_num:
+            self.springs_num = system.springs_num
+            self.alive = np.packbits(np.isin(self.keys, system.node1.astype(np.int64) * system.points_num + system.node2))
+        frame['springs'] = self.alive
+        if 'vel' in self.dtype.names:
+            frame['vel'] = system.vel
+        if 'energy' in self.dtype.names:
+            kinetic_energy = system.kinetic_energy()
+            gravitational_energy = system.gravitational_energy(self.gravity)
+            elastic_energy = system.elastic_energy()
+            frame['energy'] = (kinetic_energy, gravitational_energy, elastic_energy, kinetic_energy + gravitational_energy + elastic_energy)
+
+        self.filled += 1
+        self.frames += 1
+        if self.filled == len(self.chunk):
+            self.flush()
+
+    # Hands the filled Part of the Chunk to the Writer Thread and starts a new one
+    def flush(self) -> None:
+        if self.filled:
+            self.pending.put(self.chunk[:self.filled])
+            self.chunk = np.zeros(len(self.chunk), dtype = self.dtype)
+            self.filled = 0
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.flush()
+        self.pending.put(None)
+        self.thread.join()
+        self.file.close()
+
+
+class TrajectoryReader:
+
+    __slots__ = ('header', 'node1', 'node2', 'fixed', 'order', 'frames')
+
+    def __init__(self, path: str) -> None:
+
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a trajectory file")
+            header_length, = struct.unpack('<Q', file.read(8))
+            self.header = json.loads(file.read(header_length))
+
+        points_num, springs_num = self.header['points_num'], self.header['springs_num']
+        offset = len(MAGIC) + 8 + header_length
+
+        # Topology
+        self.node1 = np.fromfile(path, dtype = '<i4', count = springs_num, offset = offset).astype(np.intp)
+        self.node2 = np.fromfile(path, dtype = '<i4', count = springs_num, offset = offset + 4 * springs_num).astype(np.intp)
+        self.fixed = np.fromfile(path, dtype = 'u1', count = points_num, offset = offset + 8 * springs_num).astype(bool)
+        offset += 8 * springs_num + points_num
+
+        # Builder Index of every Node (Files without it were recorded in Builder Order)
+        if self.header.get('order'):
+            self.order = np.fromfile(path, dtype = '<i4', count = points_num, offset = offset).astype(np.intp)
+            offset += 4 * points_num
+        else:
+            self.order = np.arange(points_num)
+        offset += -offset % ALIGNMENT
+
+        # Frames are memory-mapped, so any Frame is read without loading the others
+        dtype = frame_dtype(points_num, self.header['velocities'], self.header['energies'], springs_num if self.header.get('springs_mask') else None)
+        with open(path, 'rb') as file:
+            file.seek(0, 2)
+            count = (file.tell() - offset) // dtype.itemsize
+        self.frames = np.memmap(path, dtype = dtype, mode = 'r', offset = offset, shape = (count,)) if count else np.zeros(0, dtype = dtype)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index: int) -> np.void:
+        return self.frames[index]
+
+    def positions(self, index: int) -> np.ndarray:
+        return np.asarray(self.frames[index]['pos'], dtype = float)
+
+    # Whether every recorded Spring is still there in a Frame (Files without the Mask keep every Spring)
+    def springs(self, index: int) -> np.ndarray:
+        springs_num = self.header['springs_num']
+        if 'springs' not in self.frames.dtype.names:
+            return np.ones(springs_num, dtype = bool)
+        return np.unpackbits(self.frames[index]['springs'], count = springs_num).astype(bool)
+
+    def times(self) -> np.ndarray:
+        return np.asarray(self.frames['t'])
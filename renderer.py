@@ -0,0 +1,240 @@
+from vpython import vector, sphere, curve, points, color, box, cylinder
+import numpy as np
+from engine import ParticleSystem
+from obstacles import Sphere, Box, Plane, Capsule, Heightfield
+
+
+# Spring (among the given ones) passing closest to a Position
+def nearest_spring(springs: list, position: np.ndarray):
+
+    if not springs:
+        return None
+    start = np.array([spring.node1.pos for spring in springs])
+    end = np.array([spring.node2.pos for spring in springs])
+    segment = end - start
+    along = np.einsum('ij,ij->i', position - start, segment) / np.maximum(np.einsum('ij,ij->i', segment, segment), np.finfo(float).tiny)
+    closest = start + np.clip(along, 0, 1)[:, None] * segment
+    return springs[int(np.argmin(np.linalg.norm(closest - position, axis = 1)))]
+
+
+# Static Shapes for the Obstacles, drawn once since they never move
+def draw_obstacles(obstacles: list, size: float = 20) -> None:
+
+    for obstacle in obstacles:
+        match obstacle:
+            case Sphere():
+                sphere(pos = vector(*obstacle.center), radius = obstacle.radius, color = color.gray(0.7))
+            case Box():
+                box(pos = vector(*obstacle.center), size = vector(*(2 * obstacle.half)), color = color.gray(0.7))
+            case Capsule():
+                axis = obstacle.end - obstacle.start
+                cylinder(pos = vector(*obstacle.start), axis = vector(*axis), radius = obstacle.radius, color = color.gray(0.7))
+                for end in (obstacle.start, obstacle.end):
+                    sphere(pos = vector(*end), radius = obstacle.radius, color = color.gray(0.7))
+            case Plane():
+
+                # A thin square Slab of the given Size lying on the Plane
+                box(pos = vector(*obstacle.point), axis = vector(*np.cross(obstacle.normal, (0, 0, 1) if abs(obstacle.normal[2]) < 0.9 else (1, 0, 0))),
+                    up = vector(*obstacle.normal), size = vector(size, 0.01, size), color = color.gray(0.5))
+            case Heightfield():
+
+                # Grid Lines along both Directions
+                rows, columns = obstacle.heights.shape
+                x = obstacle.origin[0] + np.arange(columns) * obstacle.spacing
+                z = obstacle.origin[2] + np.arange(rows) * obstacle.spacing
+                y = obstacle.origin[1] + obstacle.heights
+                for row in range(rows):
+                    curve(pos = [vector(x[c], y[row, c], z[row]) for c in range(columns)], color = color.gray(0.5))
+                for column in range(columns):
+                    curve(pos = [vector(x[column], y[r, column], z[r]) for r in range(rows)], color = color.gray(0.5))
+
+
+class Renderer:
+
+    __slots__ = ('points', 'springs', 'spheres', 'lines')
+
+    def __init__(self, points: list, springs: list) -> None:
+
+        # Variable Declaration
+        self.points = points        # Nodes Rendered as Spheres
+        self.springs = springs      # Springs Rendered as Curves (deleted Springs leave the List)
+        self.spheres = {}           # Node drawn by every Sphere, by Sphere Identity
+        self.lines = {}             # Spring drawn by every Curve, by Curve Identity
+
+        # Rendering the Nodes with Spheres
+        for point in self.points:
+            point.object = sphere(
+                pos = vector(*point.pos),   # Position of the Node
+                radius = 0.1,               # Radius of the Node
+                color = color.red           # Color of the Node
+            )
+            self.spheres[id(point.object)] = point.index
+
+        # Rendering the Springs with Curves
+        for spring in self.springs:
+            spring.line = curve(vector(*spring.node1.pos), vector(*spring.node2.pos))
+            self.lines[id(spring.line)] = spring
+
+    def draw(self) -> None:
+
+        # Rendering the Updated Nodes
+        for point in self.points:
+            point.object.pos = vector(*point.pos)
+
+        # Rendering the Updated Springs
+        for spring in self.springs:
+            spring.line.modify(0, vector(*spring.node1.pos))
+            spring.line.modify(1, vector(*spring.node2.pos))
+
+    # Index of the Node under the Mouse, None if no Node was picked
+    def node_at(self, pick, mouse_pos: vector, mouse_ray: vector) -> int | None:
+        return self.spheres.get(id(pick))
+
+    def spring_at(self, pick, mouse_pos: vector):
+        return self.lines.get(id(pick))
+
+    # Shows a dragged Node right away, even while the Physics is paused
+    def move(self, point) -> None:
+        point.object.pos = vector(*point.pos)
+
+    def remove(self, spring) -> None:
+        self.lines.pop(id(spring.line), None)
+        spring.line.visible = False
+
+
+class BatchRenderer:
+
+    __slots__ = ('system', 'springs', 'particles', 'chains', 'lines', 'chain_of', 'line_of', 'spare')
+
+    def __init__(self, system: ParticleSystem, springs: list) -> None:
+
+        # Variable Declaration
+        self.system = system        # Positions of every Node
+        self.springs = springs      # Springs still in the Simulation
+        self.chains = []            # Node Indices and Springs of every Polyline
+        self.lines = []             # One Curve per Chain
+        self.chain_of = {}          # Chain of every Spring, by Spring Identity
+        self.line_of = {}           # Chain drawn by every Curve, by Curve Identity
+        self.spare = []             # Chains left without Springs, whose Curves are reused
+
+        # Every Node is drawn by a single points Object
+        self.particles = points(pos = self.vectors(np.arange(system.points_num)), radius = 4, color = color.red)
+        self.build()
+
+    def vectors(self, indices: np.ndarray) -> list:
+        return [vector(*p) for p in self.system.pos[indices].tolist()]
+
+    # Splits the Springs into as few Polylines as possible, so a Grid becomes its Rows and Columns
+    def build(self) -> None:
+
+        # Unused Springs attached to every Node
+        attached = {}
+        for spring in self.springs:
+            attached.setdefault(spring.node1.index, []).append(spring)
+            attached.setdefault(spring.node2.index, []).append(spring)
+
+        used = set()
+
+        def walk(node: int, chain_nodes: list, chain_springs: list) -> None:
+            while True:
+                options = [s for s in attached.get(node, ()) if id(s) not in used]
+                if not options:
+                    return
+                spring = options[0]
+                used.add(id(spring))
+                node = spring.node2.index if spring.node1.index == node else spring.node1.index
+                chain_nodes.append(node)
+                chain_springs.append(spring)
+
+        self.chains = []
+        for spring in self.springs:
+            if id(spring) in used:
+                continue
+            used.add(id(spring))
+
+            # Extend the Chain from both Ends of its first Spring
+            forward_nodes, forward_springs = [spring.node2.index], [spring]
+            walk(spring.node2.index, forward_nodes, forward_springs)
+            backward_nodes, backward_springs = [spring.node1.index], []
+            walk(spring.node1.index, backward_nodes, backward_springs)
+
+            nodes = np.array(backward_nodes[::-1] + forward_nodes)
+            self.chains.append((nodes, backward_springs[::-1] + forward_springs))
+
+        self.lines = [curve(pos = self.vectors(nodes)) for nodes, _ in self.chains]
+        self.chain_of = {id(spring): index for index, (_, chain_springs) in enumerate(self.chains) for spring in chain_springs}
+        self.line_of = {id(line): index for index, line in enumerate(self.lines)}
+
+    # Chain shown by a Curve, drawn right away
+    def redraw(self, index: int) -> None:
+        nodes, _ = self.chains[index]
+        self.lines[index].clear()
+        self.lines[index].append(self.vectors(nodes))
+
+    # Every Primitive is refreshed with one bulk Update
+    def draw(self) -> None:
+
+        self.particles.clear()
+        self.particles.append(self.vectors(np.arange(self.system.points_num)))
+        for line, (nodes, chain_springs) in zip(self.lines, self.chains):
+            if chain_springs:
+                line.clear()
+                line.append(self.vectors(nodes))
+
+    # The points Object does not tell which Node was hit, so the Node nearest to the Mouse Ray is taken, the one
+    # closest to the Camera among those within radius of the nearest (mouse_pos lies on the Ray, at the Scene Center Depth)
+    def node_at(self, pick, mouse_pos: vector, mouse_ray: vector, radius: float = 0.25) -> int | None:
+
+        if pick is not self.particles or self.system.points_num == 0:
+            return None
+        ray = np.array((mouse_ray.x, mouse_ray.y, mouse_ray.z))
+        ray /= np.linalg.norm(ray)
+        offset = self.system.pos - (mouse_pos.x, mouse_pos.y, mouse_pos.z)
+        depth = offset @ ray
+        across = np.sqrt(np.maximum(np.einsum('ij,ij->i', offset, offset) - depth ** 2, 0))
+        candidates = np.flatnonzero(across <= across.min() + radius)
+        return int(candidates[np.argmin(depth[candidates])])
+
+    def spring_at(self, pick, mouse_pos: vector):
+        index = self.line_of.get(id(pick))
+        if index is None:
+            return None
+        return nearest_spring(self.chains[index][1], np.array((mouse_pos.x, mouse_pos.y, mouse_pos.z)))
+
+    def move(self, point) -> None:
+        self.particles.modify(point.index, pos = vector(*point.pos))
+
+    # Only the Chain holding the Spring is split where it was, the longer Part keeps the Chain and its Curve,
+    # the shorter one moves to a spare Curve (or a new one when there is none)
+    def remove(self, spring) -> None:
+
+        index = self.chain_of.pop(id(spring), None)
+        if index is None:
+            return
+        nodes, chain_springs = self.chains[index]
+        k = next(i for i, other in enumerate(chain_springs) if other is spring)
+
+        # A closed Chain just opens at the removed Spring
+        if nodes[0] == nodes[-1]:
+            self.chains[index] = (np.concatenate((nodes[k + 1:], nodes[1:k + 1])), chain_springs[k + 1:] + chain_springs[:k])
+            self.redraw(index)
+            return
+
+        parts = sorted(((nodes[:k + 1], chain_springs[:k]), (nodes[k + 1:], chain_springs[k + 1:])), key = lambda part: len(part[1]), reverse = True)
+        (long_nodes, long_springs), (short_nodes, short_springs) = parts
+        self.chains[index] = (long_nodes if long_springs else nodes[:0], long_springs)
+        self.redraw(index)
+        if not long_springs:
+            self.spare.append(index)
+        if short_springs:
+            if self.spare:
+                other = self.spare.pop()
+                self.chains[other] = (short_nodes, short_springs)
+            else:
+                other = len(self.chains)
+                self.chains.append((short_nodes, short_springs))
+                self.lines.append(curve())
+                self.line_of[id(self.lines[other])] = other
+            for moved in short_springs:
+                self.chain_of[id(moved)] = other
+            self.redraw(other)
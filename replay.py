@@ -0,0 +1,110 @@
+from vpython import rate, button, slider, wtext, scene
+import numpy as np
+from engine import ParticleSystem
+from point import Point
+from constraint import Spring
+from recorder import TrajectoryReader
+from renderer import Renderer
+
+class Replay:
+
+    __slots__ = ('reader', 'system', 'renderer', 'speed', 'fps', 'frame', 'playing', 'slider', 'caption', 'frame_time', 'alive')
+
+    # Playback Speeds selectable with the Keyboard
+    SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16)
+
+    def __init__(self, path: str, speed: float = 1, fps: float = 30) -> None:
+
+        # Variable Declaration
+        self.reader = TrajectoryReader(path)
+        self.speed = speed          # Simulated Seconds shown per Second
+        self.fps = fps              # Rendered Frames per Second, independent of the recorded Rate
+        self.frame = 0.0            # Current Frame, fractional so slow Speeds advance smoothly
+        self.playing = False
+
+        # Simulated Time between two recorded Frames
+        times = self.reader.times()
+        self.frame_time = float(times[1] - times[0]) if len(times) > 1 else 1.0
+
+        # The recorded Topology is rendered through the same Views as a live Simulation
+        points_num = self.reader.header['points_num']
+        self.system = ParticleSystem.from_arrays(
+            pos = self.reader.positions(0),
+            node1 = self.reader.node1,
+            node2 = self.reader.node2,
+            length = np.zeros(len(self.reader.node1)),
+            elasticity = np.zeros(len(self.reader.node1)),
+            fixed = self.reader.fixed
+        )
+        points = [Point.view(self.system, i) for i in range(points_num)]
+        springs = [Spring.view(self.system, i, points[a], points[b]) for i, (a, b) in enumerate(zip(self.reader.node1, self.reader.node2))]
+        self.renderer = Renderer(points, springs)
+        self.alive = np.ones(len(springs), dtype = bool)    # Springs shown, those broken by then are hidden
+
+        # Controls
+        button(
+            pos = scene.title_anchor,       # Displayed above the scene
+            text = 'Play',                  # Text on the Button
+            bind = self.play_and_pause      # Function Invoked when the Button is Clicked
+        )
+        self.slider = slider(
+            pos = scene.caption_anchor,     # Displayed below the scene
+            min = 0,
+            max = max(len(self.reader) - 1, 1),
+            step = 1,
+            value = 0,
+            length = 600,
+            bind = self.scrub               # Function Invoked when the Slider is Dragged
+        )
+        self.caption = wtext(pos = scene.caption_anchor, text = '')
+        scene.bind('keydown', self.key_down)
+
+    def play_and_pause(self, _ = None) -> None:
+        self.playing = not self.playing
+
+    def scrub(self, widget) -> None:
+        self.frame = float(widget.value)
+        self.show()
+
+    # Space plays and pauses, arrows step one Frame, + and - change Speed
+    def key_down(self, ev) -> None:
+
+        match ev.key:
+            case ' ':
+                self.play_and_pause()
+            case 'right':
+                self.frame = min(self.frame + 1, len(self.reader) - 1)
+            case 'left':
+                self.frame = max(self.frame - 1, 0)
+            case '+' | '=':
+                self.speed = min((s for s in self.SPEEDS if s > self.speed), default = self.speed)
+            case '-':
+                self.speed = max((s for s in self.SPEEDS if s < self.speed), default = self.speed)
+        self.show()
+
+    def show(self) -> None:
+
+        index = int(self.frame)
+        self.system.pos[:] = self.reader.positions(index)
+        alive = self.reader.springs(index)
+        for changed in np.flatnonzero(alive != self.alive).tolist():
+            self.renderer.springs[changed].line.visible = bool(alive[changed])
+        self.alive = alive
+        self.renderer.draw()
+        self.slider.value = index
+        self.caption.text = f"  t = {self.reader[index]['t']:.2f}s  frame {index + 1}/{len(self.reader)}  speed {self.speed}x"
+
+    def run(self) -> None:
+
+        self.show()
+        while True:
+            rate(self.fps)
+            if not self.playing or len(self.reader) == 0:
+                continue
+
+            # Frames in between are skipped when the Speed asks for more than one per rendered Frame
+            self.frame += self.speed / (self.fps * self.frame_time)
+            if self.frame >= len(self.reader) - 1:
+                self.frame = len(self.reader) - 1
+                self.playing = False
+            self.show()
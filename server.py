@@ -0,0 +1,287 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import queue
+import struct
+import threading
+import time
+import numpy as np
+from engine import ParticleSystem
+
+# Accept Key of the WebSocket Handshake (RFC 6455)
+GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# Frame Opcodes
+TEXT, BINARY, CLOSE, PING, PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+# Binary Frame Header: kind, frame number, simulated time, number of nodes; the Positions follow
+#   F16 : origin (3 x float32), then every Position minus the origin as float16
+#   KEY : every Position in quanta (int32), sent first and whenever a Delta would overflow
+#   DLT : change of every Position in quanta since the last Frame the Viewer received (int16)
+HEADER = struct.Struct('<4sIdI')
+ORIGIN = struct.Struct('<3f')
+KEYFRAME, DELTA, HALF = b'KEY\0', b'DLT\0', b'F16\0'
+
+
+def accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode() + GUID).digest()).decode()
+
+
+# Server Frames are never masked
+def encode_message(opcode: int, payload: bytes) -> bytes:
+
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+# Next complete Message from a Client as (opcode, payload), Fragments are joined and Client Frames unmasked
+async def read_message(reader: asyncio.StreamReader) -> tuple:
+
+    opcode, parts = None, []
+    while True:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack('!H', await reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack('!Q', await reader.readexactly(8))
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask is not None:
+            payload = (np.frombuffer(payload, dtype = np.uint8) ^ np.resize(np.frombuffer(mask, dtype = np.uint8), length)).tobytes()
+
+        # Control Frames may come between the Fragments of a Message
+        if first & 0x0F >= CLOSE:
+            return first & 0x0F, payload
+        if opcode is None:
+            opcode = first & 0x0F
+        parts.append(payload)
+        if first & 0x80:
+            return opcode, b''.join(parts)
+
+
+class Frame:
+
+    __slots__ = ('number', 't', 'pos', 'topology')
+
+    def __init__(self, number: int, t: float, pos: np.ndarray, topology: bytes) -> None:
+        self.number = number        # Frames published so far
+        self.t = t                  # Simulated Time
+        self.pos = pos              # Copy of the Positions, float32
+        self.topology = topology    # Topology Message the Frame belongs to
+
+
+class Viewer:
+
+    __slots__ = ('writer', 'latest', 'ready', 'quanta', 'topology')
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+
+        # Variable Declaration
+        self.writer = writer
+        self.latest = None              # Newest Frame not sent yet, older ones are dropped for a slow Viewer
+        self.ready = asyncio.Event()    # Set when latest holds a Frame
+        self.quanta = None              # Positions the Viewer holds, in quanta (Delta Encoding)
+        self.topology = None            # Last Topology Message sent
+
+    def offer(self, frame: Frame) -> None:
+        self.latest = frame
+        self.ready.set()
+
+
+class StateServer:
+
+    __slots__ = ('host', 'port', 'rate', 'encoding', 'quantum', 'wake', 'commands', 'viewers', 'loop', 'server', 'thread', 'started', 'frames', 'published', 'springs_num', 'topology')
+
+    def __init__(self, port: int = 8765, host: str = '127.0.0.1', rate: float = 30, encoding: str = 'float16', quantum: float = 1e-3, wake: threading.Event = None) -> None:
+
+        # Variable Declaration
+        self.host = host
+        self.port = port
+        self.rate = rate                # Frames published per Second of wall Time
+        self.encoding = encoding        # 'float16' or 'delta'
+        self.quantum = quantum          # Position Step of the Delta Encoding
+        self.wake = wake                # Set when a Control Message arrives, so a paused Loop wakes up
+        self.commands = queue.SimpleQueue()     # Control Messages waiting for the Simulation Thread
+        self.viewers = set()
+        self.frames = 0
+        self.published = 0.0            # Wall Time of the last published Frame
+        self.springs_num = None         # Topology the last Message was built for
+        self.topology = None
+
+        # The Event Loop runs on its own Thread: the Solver only copies Frames and never waits on a Socket
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+        self.started = threading.Event()
+        self.thread = threading.Thread(target = self.serve, daemon = True)
+        self.thread.start()
+        self.started.wait()
+        if self.server is None:
+            raise OSError(f"Cannot listen on {host}:{port}")
+        logging.warning(f"Streaming on ws://{host}:{port}")
+
+    def serve(self) -> None:
+
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+        except OSError as error:
+            logging.error(error)
+            return
+        finally:
+            self.started.set()
+        self.loop.run_forever()
+
+    # Called by the Simulation after its Steps: at most rate Frames per Second are handed over to the Event Loop
+    def publish(self, t: float, system: ParticleSystem) -> None:
+
+        now = time.perf_counter()
+        if not self.viewers or now - self.published < 1 / self.rate:
+            return
+        self.published = now
+
+        # Topology Messages are only built again when Springs were deleted
+        if self.springs_num != system.springs_num:
+            self.springs_num = system.springs_num
+            self.topology = json.dumps({
+                'type': 'topology',
+                'encoding': self.encoding,
+                'quantum': self.quantum,
+                'points_num': system.points_num,
+                'node1': system.node1.tolist(),
+                'node2': system.node2.tolist(),
+                'fixed': np.flatnonzero(system.fixed).tolist()
+            }).encode()
+        self.frames += 1
+        frame = Frame(self.frames, t, system.pos.astype(np.float32), self.topology)
+        self.loop.call_soon_threadsafe(self.broadcast, frame)
+
+    def broadcast(self, frame: Frame) -> None:
+        for viewer in self.viewers:
+            viewer.offer(frame)
+
+    # Control Messages received since the last Call, for the Simulation Thread to apply between Steps
+    def drain(self) -> list:
+        messages = []
+        while not self.commands.empty():
+            messages.append(self.commands.get())
+        return messages
+
+    # Frame encoded for one Viewer, Deltas are taken against what that Viewer last received
+    def encode(self, viewer: Viewer, frame: Frame) -> bytes:
+
+        points_num = len(frame.pos)
+        if self.encoding == 'float16':
+            origin = frame.pos.mean(axis = 0) if points_num else np.zeros(3, dtype = np.float32)
+            offsets = (frame.pos - origin).astype('<f2')
+            return HEADER.pack(HALF, frame.number, frame.t, points_num) + ORIGIN.pack(*origin) + offsets.tobytes()
+
+        quanta = np.rint(frame.pos / self.quantum).astype(np.int64)
+        if viewer.quanta is not None and viewer.quanta.shape == quanta.shape:
+            delta = quanta - viewer.quanta
+            if np.abs(delta).max(initial = 0) < 1 << 15:
+                viewer.quanta = quanta
+                return HEADER.pack(DELTA, frame.number, frame.t, points_num) + delta.astype('<i2').tobytes()
+        viewer.quanta = quanta
+        return HEADER.pack(KEYFRAME, frame.number, frame.t, points_num) + quanta.astype('<i4').tobytes()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+
+        # Handshake: an HTTP Upgrade Request carrying the Key
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'sec-websocket-key' not in headers or headers.get('upgrade', '').lower() != 'websocket':
+            writer.write(b'HTTP/1.1 426 Upgrade Required\r\nSec-WebSocket-Version: 13\r\nContent-Length: 0\r\n\r\n')
+            writer.close()
+            return
+        writer.write((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+        ).encode())
+
+        viewer = Viewer(writer)
+        self.viewers.add(viewer)
+        sender = asyncio.ensure_future(self.send_frames(viewer))
+        try:
+            await self.receive(reader, writer)
+
+        # Also ends quietly when the Server shuts down
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            sender.cancel()
+            writer.close()
+
+    # Every Viewer is sent only its newest Frame, whenever its Socket has drained the previous one
+    async def send_frames(self, viewer: Viewer) -> None:
+
+        try:
+            while True:
+                await viewer.ready.wait()
+                viewer.ready.clear()
+                frame, viewer.latest = viewer.latest, None
+                if viewer.topology is not frame.topology:
+                    viewer.topology = frame.topology
+                    viewer.quanta = None
+                    viewer.writer.write(encode_message(TEXT, frame.topology))
+                viewer.writer.write(encode_message(BINARY, self.encode(viewer, frame)))
+                await viewer.writer.drain()
+        except ConnectionError:
+            pass
+
+    # Control Messages are JSON Text, queued for the Simulation Thread
+    async def receive(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+
+        while True:
+            opcode, payload = await read_message(reader)
+            if opcode == CLOSE:
+                writer.write(encode_message(CLOSE, payload[:2]))
+                return
+            if opcode == PING:
+                writer.write(encode_message(PONG, payload))
+            elif opcode == TEXT:
+                try:
+                    message = json.loads(payload)
+                except ValueError:
+                    logging.warning(f"Ignored malformed control message {payload[:80]!r}")
+                    continue
+                self.commands.put(message)
+                if self.wake is not None:
+                    self.wake.set()
+
+    # Stops listening, closes every Viewer and waits for their Tasks before the Loop stops
+    async def shutdown(self) -> None:
+
+        self.server.close()
+        for viewer in self.viewers:
+            viewer.writer.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
+
+    def close(self) -> None:
+
+        if self.server is None or not self.loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop).result(1)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(1)
@@ -1,25 +1,124 @@
 from point import Point 
 from constraint import Spring
-from vpython import * 
-import matplotlib.pyplot as plt
+from engine import ParticleSystem, to_array
+from topology import grid_topology, Topology, STRUCTURAL
+from diagnostics import EnergyMonitor
+from collision import SpatialHash, SelfCollision
+from adaptive import AdaptiveStepper
+from profiling import Profiler
+import atexit
+import queue
+import threading
+import time
+import json
+import os
+import numpy as np
 import logging
 
 class Simulation:
 
-    __slots__ = ('points', 'total_graph', 'kinetic_graph', 'elastic_graph', 'gravitational_graph', 'springs', 'elasticity', 'mass', 'friction', 'integration', 'gravity', 'dt', 't', 'simulating', 'event', 'drag', 'dragged_point')
+    __slots__ = ('points', 'topology', 'total_graph', 'kinetic_graph', 'elastic_graph', 'gravitational_graph', 'springs', 'system', 'renderer', 'elasticity', 'mass', 'friction', 'integration', 'gravity', 'dt', 't', 'simulating', 'event', 'drag', 'dragged_point', 'pinned', 'headless', 'steps', 'duration', 'output', 'energy', 'collision', 'picker', 'stepper', 'recording', 'recorder', 'render', 'fps', 'checkpointing', 'solver', 'parallel', 'tearing', 'obstacles', 'activity', 'server', 'commands', 'profiler', 'profile_path')
 
-    def __init__(self, elasticity: float, mass: float, friction: float, gravity: vector, dt: float, integration: str):
+    def __init__(self, elasticity: float, mass: float, friction: float, gravity: np.ndarray, dt: float, integration: str, headless: bool = False, steps: int = None, duration: float = None, output: str = None, energy_interval: int = 10, thickness: float = None, adaptive: bool = False, render: str = 'objects', fps: float = 30, engine: str = 'force', iterations: int = 10, solver: str = 'gauss-seidel', profiler: Profiler = None, profile_path: str = None, threads: int = 1, tearing: float = None, obstacles: list = None, sleep: float = None, sleep_steps: int = 60, serve: int = None, serve_rate: float = 30, encoding: str = 'float16'):
 
         # Variables
         self.points = []
         self.springs = []
+        self.system = None
+        self.topology = None    # Compiled Topology of the System, set before the first Step
+        self.renderer = None
         self.elasticity = elasticity
         self.mass = mass
         self.friction = friction
-        self.gravity = gravity
+        self.gravity = to_array(gravity)
         self.integration = integration
         self.dt = dt
         self.t = 0 
+        self.energy = EnergyMonitor(energy_interval)    # Sampled Energy History
+
+        # Collisions and Picking
+        self.collision = None if thickness is None else SelfCollision(thickness)   # Self Collision, off without a Thickness
+        self.picker = SpatialHash(0.5)      # Finds the Node nearest to a Position, refreshed once per Frame
+
+        # Static Scene Geometry the Cloth collides with (Spheres, Boxes, Planes, Capsules, Heightfields)
+        if obstacles:
+            from obstacles import Obstacles
+            self.obstacles = Obstacles(obstacles)
+        else:
+            self.obstacles = None
+
+        # Adaptive Mode: dt becomes the Frame Interval, split in as many Substeps as Stability requires
+        self.stepper = AdaptiveStepper(explicit = integration != 'Implicit' and engine != 'xpbd') if adaptive else None
+
+        # Engines with a State kept across Steps: XPBD Constraint Projection or Implicit Integration (None steps Forces explicitly)
+        # (Optional Engines are only imported when chosen, so a plain Run starts faster)
+        if engine == 'xpbd':
+            from xpbd import XPBDSolver
+            self.solver = XPBDSolver(iterations, solver)
+        elif integration == 'Implicit':
+            from implicit import ImplicitEuler
+            self.solver = ImplicitEuler()
+        else:
+            self.solver = None
+
+        # Spring Forces and Integration split over a Pool of Threads (None runs them on the calling Thread)
+        if threads > 1 and self.solver is None:
+            from parallel import ParallelSystem
+            self.parallel = ParallelSystem(threads)
+        else:
+            self.parallel = None
+
+        # Islands at Rest for sleep_steps Steps (Speed below sleep) are left out of the Passes, None keeps everything awake
+        if sleep is not None:
+            from activity import ActivityTracker
+            self.activity = ActivityTracker(sleep, steps = sleep_steps)
+        else:
+            self.activity = None
+
+        # Frames streamed to WebSocket Viewers on the serve Port, which send back Control Messages (None streams nothing)
+        self.event = threading.Event()  # Wakes the paused Render Loop up (Run Button, Mouse Events and Control Messages)
+        if serve is not None:
+            from server import StateServer
+            self.server = StateServer(serve, rate = serve_rate, encoding = encoding, wake = self.event)
+        else:
+            self.server = None
+
+        # Strain beyond which Springs break, None never tears
+        self.tearing = tearing
+
+        # Trajectory Recording, opened once the System exists
+        self.recording = None
+        self.recorder = None
+
+        # Rendering: one Object per Node and Spring, or a few batched Primitives, drawn fps times per Second
+        self.render = render
+        self.fps = fps
+
+        # Periodic Checkpoints
+        self.checkpointing = None
+
+        # Per-Phase Timers and Counters, dumped as JSON to profile_path when the Run ends
+        self.profiler = Profiler() if profiler is None else profiler
+        self.profile_path = profile_path
+
+        # Headless Mode (vpython is never imported)
+        self.headless = headless
+        self.steps = steps          # Number of Steps to Simulate
+        self.duration = duration    # Simulated Time to Reach (used when steps is None)
+        self.output = output        # File where the Final State is Written
+
+        # Simulation
+        self.simulating = False 
+        self.drag = False
+        self.dragged_point = None
+        self.pinned = False             # Whether the dragged Node was already Fixed before being grabbed
+        self.commands = queue.SimpleQueue()     # Mouse Actions waiting to be applied between Frames
+        if not headless:
+            self.setup_scene()
+
+    def setup_scene(self):
+
+        from vpython import graph, gcurve, color, button, scene, curve
 
         # Graph
         graph(scroll=True, xmin = 0, xmax = 5)
@@ -28,9 +127,7 @@ class Simulation:
         self.elastic_graph = gcurve(color=color.green, label="E<sub>elastic</sub>", interval=1)
         self.gravitational_graph = gcurve(color=color.blue, label="E<sub>gravitational</sub>", interval=1)
         
-        # Simulation
-        self.simulating = False 
-        self.drag = False
+        # Run Button
         button(
             pos = scene.title_anchor,       # Displayed above the scene
             text = 'Run',                   # Text on the Button 
@@ -42,7 +139,9 @@ class Simulation:
             logging.debug(f"mouse_click \n ev.pos: {ev.pos}, object: {scene.mouse.pick}")
 
             if isinstance(scene.mouse.pick, curve):
-                self.delete_spring(scene.mouse.pick)
+                spring = self.renderer.spring_at(scene.mouse.pick, scene.mouse.pos)
+                if spring is not None:
+                    self.queue({'type': 'delete', 'spring': spring})
 
         scene.bind('click', mouse_click)
 
@@ -50,65 +149,244 @@ class Simulation:
         def mouse_down():
             logging.debug(f"mouse_down \n object: {scene.mouse.pick}")
 
-            if isinstance(scene.mouse.pick, sphere):
-                for point in self.points:
-                    if point.object == scene.mouse.pick:
-                        self.drag = True
-                        self.dragged_point = point
+            index = self.renderer.node_at(scene.mouse.pick, scene.mouse.pos, scene.mouse.ray)
+            if index is not None:
+                self.queue({'type': 'grab', 'node': index})
 
         scene.bind('mousedown', mouse_down)
 
 
         def mouse_move():
             logging.debug(f"mouse_move \n pos: {scene.mouse.pos}")
-            if self.drag and self.dragged_point:
-                self.dragged_point.pos = scene.mouse.pos 
-                self.dragged_point.object.pos = scene.mouse.pos 
+            if self.drag:
+                self.queue({'type': 'drag', 'pos': to_array(scene.mouse.pos)})
 
         scene.bind('mousemove', mouse_move)
 
 
         def mouse_up():
-            self.dragged_point = None 
-            self.drag = False
+            self.queue({'type': 'release'})
 
         scene.bind('mouseup', mouse_up)
 
-    def delete_spring(self, line_to_delete):
-
-        for spring in self.springs:
-            if spring.line == line_to_delete:
-                spring.line.visible = False 
-                self.springs.remove(spring)
+    # Mouse Events may fire while a Step runs, so they only queue Control Messages applied between Frames
+    def queue(self, message: dict) -> None:
+        self.commands.put(message)
+        self.event.set()
+
+    # Control Messages of the Mouse and of remote Viewers, in the Order they came
+    def apply_commands(self) -> None:
+        while not self.commands.empty():
+            self.control(self.commands.get())
+        if self.server is not None:
+            for message in self.server.drain():
+                self.control(message)
+
+    # The grabbed Node is pinned, so the rest of the Cloth keeps being simulated while it follows the Mouse
+    def grab(self, point: Point) -> None:
+
+        self.release()
+        if self.activity is not None:
+            self.activity.wake([point.index])
+        self.pinned = point.fixed
+        point.fixed = True
+        self.dragged_point = point
+        self.drag = True
+        self.event.set()
+
+    # The pinned Node follows the Mouse, waking the Islands it pulls on
+    def drag_to(self, position) -> None:
+
+        point = self.dragged_point
+        if not self.drag or point is None:
+            return
+        point.pos = position
+        if self.activity is not None:
+            self.activity.wake([point.index])
+        if self.renderer is not None:
+            self.renderer.move(point)
+
+    def release(self) -> None:
+
+        point = self.dragged_point
+        if point is not None:
+
+            # The Node is let go at Rest where the Mouse left it
+            point.fixed = self.pinned
+            point.prev_pos = point.pos
+            point.vel = (0, 0, 0)
+        self.dragged_point = None
+        self.drag = False
+        self.event.set()
+
+    # The List follows the Rows moved in the Arrays, so nothing is shifted
+    def delete_spring(self, spring):
+
+        if self.system is None:
+            self.springs.remove(spring)
+        else:
+            for source, target in self.remove_spring(spring.index):
+                moved = self.springs[source]
+                self.springs[target] = moved
+                moved.index = target
+            self.springs.pop()
+            if self.activity is not None:
+                self.activity.wake([spring.node1.index, spring.node2.index])
+        if self.renderer is not None:
+            self.renderer.remove(spring)
+        self.event.set()
+
+    # Removes a Spring from the Arrays and from whatever the Engines gathered from them, returns the Rows moved into
+    # freed ones as (source, target) Pairs: a Swap-Remove, or one Row per Partition when the Parallel Pass keeps them contiguous
+    def remove_spring(self, index: int) -> list:
+
+        if self.parallel is not None:
+            return self.parallel.remove_spring(self.system, index)
+        last = self.system.remove_spring(index)
+        if hasattr(self.solver, 'remove_spring'):
+            self.solver.remove_spring(self.system, index, last)
+        return [] if last == index else [(last, index)]
+
+    # Springs stretched beyond the Tearing Strain break, returns how many did
+    def tear(self) -> int:
+
+        broken = np.flatnonzero(self.system.strain() > self.tearing)
+
+        # From the last Row down, so every Spring moved by a Removal (always from a later Row) has already been checked
+        for index in broken[::-1].tolist():
+            if self.springs:
+                self.delete_spring(self.springs[index])
+            else:
+                nodes = [self.system.node1[index], self.system.node2[index]]
+                self.remove_spring(index)
+                if self.activity is not None:
+                    self.activity.wake(nodes)
+        return len(broken)
+
+    # Streams the Trajectory to a File every stride Steps once the Simulation runs
+    def record(self, path: str, stride: int = 1, velocities: bool = False, energies: bool = False) -> None:
+        self.recording = {'path': path, 'stride': stride, 'velocities': velocities, 'energies': energies}
+
+    # Writes a Checkpoint every given Number of Steps
+    def checkpoint(self, path: str, every: int) -> None:
+        self.checkpointing = {'path': path, 'every': max(1, every), 'steps': 0}
+
+    # Full State in one binary File: Arrays (deleted Springs are already gone from them), Time, Settings and Dragging
+    def save_checkpoint(self, path: str) -> None:
+
+        config = {
+            'elasticity': self.elasticity,
+            'mass': self.mass,
+            'friction': self.friction,
+            'gravity': self.gravity.tolist(),
+            'dt': self.dt,
+            'integration': self.integration
+        }
+        dragged = -1 if self.dragged_point is None else self.dragged_point.index
+
+        # A dragged Node is only pinned while grabbed, the Checkpoint keeps whether it was Fixed before
+        arrays = self.system.arrays()
+        if dragged >= 0:
+            arrays['fixed'] = arrays['fixed'].copy()
+            arrays['fixed'][dragged] = self.pinned
+
+        # Written aside and renamed, so an interrupted Write never replaces a good Checkpoint
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as file:
+            np.savez(file, t = self.t, config = json.dumps(config), drag = self.drag, dragged = dragged, order = self.topology.order, **arrays)
+        os.replace(temporary, path)
+
+    # Rebuilds a Simulation from a Checkpoint without running any Builder
+    @classmethod
+    def from_checkpoint(cls, path: str, **options) -> 'Simulation':
+
+        with np.load(path) as data:
+            config = json.loads(str(data['config']))
+            sim = cls(**config, **options)
+            sim.system = ParticleSystem.from_dict(data)
+            sim.t = float(data['t'])
+            dragged = int(data['dragged'])
+            drag = bool(data['drag'])
+            order = data['order'] if 'order' in data else None
+
+        # A Checkpoint keeps its Node Order, so the dragged Index stays valid, and the Builder Order it came from
+        sim.compile(reorder = False)
+        if order is not None:
+            topology = sim.topology
+            sim.topology = Topology(topology.node1, topology.node2, topology.length, topology.elasticity, order[topology.order], topology.duplicates)
+        if not sim.headless:
+            sim.create_views()
+
+        # The Drag goes on in both Modes, headless only needs a View of the dragged Node
+        if dragged >= 0 and drag:
+            sim.grab(sim.points[dragged] if sim.points else Point.view(sim.system, dragged, sim.integration))
+        return sim
+
+    # Node nearest to a Position, looked up in the Spatial Hash instead of scanning every Node
+    def pick(self, position) -> Point | None:
+
+        if self.picker.keys is None:
+            self.picker.update(self.system.pos)
+        index = self.picker.nearest(self.system.pos, to_array(position))
+        if index is None:
+            return None
+        return self.points[index]
+
+    # Control Message of the Mouse or of a remote Viewer, mapped onto the Button and Mouse Behavior:
+    # {"type": "run" | "stop" | "toggle"}, {"type": "grab", "node": i} or {"type": "grab", "pos": [x, y, z]},
+    # {"type": "drag", "pos": [x, y, z]}, {"type": "release"}, {"type": "delete", "spring": i}
+    def control(self, message: dict) -> None:
+
+        try:
+            match message.get('type'):
+                case 'run' | 'stop' | 'toggle' as kind:
+                    if kind == 'toggle' or self.simulating != (kind == 'run'):
+                        self.start_and_stop()
+                case 'grab':
+                    point = self.points[int(message['node'])] if 'node' in message else self.pick(message['pos'])
+                    if point is not None:
+                        self.grab(point)
+                case 'drag':
+                    self.drag_to(message['pos'])
+                case 'release':
+                    self.release()
+                case 'delete':
+
+                    # The Mouse queues the Spring itself, which is skipped if it was deleted in the meantime
+                    spring = message['spring']
+                    if not isinstance(spring, Spring):
+                        spring = self.springs[int(spring)]
+                    if spring.index < len(self.springs) and self.springs[spring.index] is spring:
+                        self.delete_spring(spring)
+                case _:
+                    logging.warning(f"Unknown control message {message}")
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError) as error:
+            logging.warning(f"Ignored control message {message}: {error!r}")
 
     def start_and_stop(self):
         self.simulating = not self.simulating
+        self.event.set()
         logging.warning("Button Pressed")
 
+    # Plots the Energy Samples taken since the last Call in one Batch per Curve
     def print_energy(self):
 
-        kinetic_energy = 0 
-        gravitational_energy = 0 
-        elastic_energy = 0
-
-        for point in self.points:
-            kinetic_energy += point.kinetic_energy() 
-            gravitational_energy += point.gravitational_energy(self.gravity)
-        for spring in self.springs: 
-            elastic_energy += spring.elastic_energy()
-        total_energy = kinetic_energy + gravitational_energy + elastic_energy
+        samples = self.energy.drain()
+        if len(samples) == 0:
+            return
 
-        self.kinetic_graph.plot(self.t, kinetic_energy)
-        self.gravitational_graph.plot(self.t, gravitational_energy)
-        self.elastic_graph.plot(self.t, elastic_energy)
-        self.total_graph.plot(self.t, total_energy)
+        t = samples[:, EnergyMonitor.T, None]
+        self.kinetic_graph.plot(np.hstack((t, samples[:, EnergyMonitor.KINETIC, None])).tolist())
+        self.gravitational_graph.plot(np.hstack((t, samples[:, EnergyMonitor.GRAVITATIONAL, None])).tolist())
+        self.elastic_graph.plot(np.hstack((t, samples[:, EnergyMonitor.ELASTIC, None])).tolist())
+        self.total_graph.plot(np.hstack((t, samples[:, EnergyMonitor.TOTAL, None])).tolist())
 
     def rope(self):
 
         points_num = 10
         for i in range(points_num):
             self.points.append(Point(
-                pos = vector(i, -i / 3, 0),
+                pos = (i, -i / 3, 0),
                 mass = self.mass,
                 friction = self.friction,
                 fixed = (i == 0 or i == points_num - 1),
@@ -123,14 +401,14 @@ class Simulation:
                 length = 0.5,
                 elasticity = self.elasticity
             ))
-        self.run()
+        return self.run()
 
     def grid(self):
 
         points_num = 100
         for i in range(points_num):
             self.points.append(Point(
-                pos = vector((i % 10 - 4.5), 0, (i // 10 - 4.5)),
+                pos = ((i % 10 - 4.5), 0, (i // 10 - 4.5)),
                 mass = self.mass,
                 friction = self.friction,
                 fixed = (i == 0 or i == 9 or i == 90 or i == 99),
@@ -152,14 +430,14 @@ class Simulation:
                     length = 0.5,
                     elasticity = self.elasticity
                 ))
-        self.run()
+        return self.run()
 
     def cloth(self):
 
         points_num = 64
         for i in range(points_num):
             self.points.append(Point(
-                pos = vector((i % 8 - 3.5), (i // 8 - 3.5), 0),
+                pos = ((i % 8 - 3.5), (i // 8 - 3.5), 0),
                 mass = self.mass,
                 friction = self.friction,
                 fixed = (i == 56 or i == 63),
@@ -187,7 +465,7 @@ class Simulation:
 
     def cloth1(self):
         self.cloth()
-        self.run()
+        return self.run()
 
     def cloth2(self):
 
@@ -220,29 +498,270 @@ class Simulation:
                     ))
 
 
-        self.run()
+        return self.run()
+
+    # Builds a Scene by Name: rope, grid, cloth1, cloth2 or sheet-<size> / sheet-<width>x<height>
+    def scene(self, name: str):
+
+        match name.split('-'):
+            case ['grid']:
+                return self.grid()
+            case ['cloth' | 'cloth1']:
+                return self.cloth1()
+            case ['cloth2']:
+                return self.cloth2()
+            case ['sheet', size]:
+                width, _, height = size.partition('x')
+                return self.sheet(int(width), int(height or width), shear = True)
+            case _:
+                return self.rope()
+
+    def step(self):
+
+        profiler, system = self.profiler, self.system
+
+        substeps, h = (1, self.dt) if self.stepper is None else self.stepper.plan(system, self.dt)
+        for _ in range(substeps):
+
+            # Only the awake Islands are stepped when some sleep
+            stepped = system if self.activity is None else self.activity.begin(system)
+            if self.solver is not None:
+                with profiler.phase('solver'):
+                    self.solver.step(stepped, h, self.gravity)
+            elif self.parallel is not None:
+                with profiler.phase('constraints'):
+                    self.parallel.apply_constraints(stepped)
+                with profiler.phase('integration'):
+                    self.parallel.integrate(stepped, h, self.gravity, self.integration)
+            else:
+                with profiler.phase('constraints'):
+                    stepped.apply_constraints()
+                with profiler.phase('integration'):
+                    stepped.add_gravity(self.gravity)
+                    stepped.integrate(h, self.integration)
+
+            # Contacts are resolved on the stepped Nodes too: a sleeping Island rests where it fell asleep,
+            # and whatever moves it from outside is caught by the Rest Check of the Activity Tracker
+            if self.collision is not None:
+                with profiler.phase('collision'):
+                    self.collision.resolve(stepped)
+            if self.obstacles is not None:
+                with profiler.phase('obstacles'):
+                    profiler.count('contacts', self.obstacles.resolve(stepped, h))
+            if self.activity is not None:
+                self.activity.end(system, stepped)
+            if self.tearing is not None:
+                with profiler.phase('tearing'):
+                    profiler.count('torn', self.tear())
+        self.t += self.dt
+        if self.activity is not None:
+            with profiler.phase('activity'):
+                profiler.set('sleeping', self.activity.update(system, self.dt))
+
+        if self.recorder is not None:
+            with profiler.phase('recording'):
+                self.recorder.record(self.t, system)
+        if self.checkpointing is not None:
+            self.checkpointing['steps'] += 1
+            if self.checkpointing['steps'] % self.checkpointing['every'] == 0:
+                with profiler.phase('checkpoint'):
+                    self.save_checkpoint(self.checkpointing['path'])
+        with profiler.phase('energy'):
+            sampled = self.energy.update(self.t, system, self.gravity)
+        if sampled and self.stepper is not None:
+            self.stepper.observe(self.energy)
+
+        profiler.count('substeps', substeps)
+        profiler.set('springs', system.springs_num)
+        profiler.end_step()
+
+    # Steps the Physics as fast as possible for a Number of Steps or up to a Simulated Time
+    def simulate(self, steps: int = None, duration: float = None) -> dict:
+
+        if steps is None:
+            steps = round((duration if duration is not None else 0) / self.dt)
+        for _ in range(steps):
+            self.step()
+
+        return self.state()
+
+    # Headless Run streamed to remote Viewers: the Physics keeps Pace with the wall Clock, applies the Control Messages
+    # between Steps and publishes Frames, until the Steps or the Simulated Time are reached (forever if neither is given)
+    def serve(self, steps: int = None, duration: float = None) -> dict:
+
+        if steps is None and duration is not None:
+            steps = round(duration / self.dt)
+
+        # Remote Viewers drag and delete through the Views
+        if not self.points:
+            self.create_views()
+        self.simulating = True
+
+        # Steps owed beyond a few Frames are dropped: a Solver slower than real Time falls behind instead of piling up
+        # a Backlog that would starve the Viewers and delay the Control Messages
+        lag = 3 * max(1, round(1 / (self.server.rate * self.dt)))
+        done, steps_due, clock = 0, 0.0, time.perf_counter()
+        try:
+            while steps is None or done < steps:
+
+                self.event.clear()
+                self.apply_commands()
+                if not self.simulating:
+                    self.event.wait(1)
+                    clock = time.perf_counter()
+                    continue
+
+                # Physics Steps owed to the Time elapsed, the Loop then waits for the next Frame or a Control Message
+                now = time.perf_counter()
+                steps_due = min(steps_due + (now - clock) / self.dt, lag)
+                clock = now
+                owed = int(steps_due)
+                if steps is not None:
+                    owed = min(owed, steps - done)
+                for _ in range(owed):
+                    self.step()
+                steps_due -= owed
+                done += owed
+                self.server.publish(self.t, self.system)
+                with self.profiler.phase('picking'):
+                    self.picker.update(self.system.pos)
+                self.event.wait(1 / self.server.rate)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.close()
+
+        return self.state()
+
+    # Final State of the Simulation as a Dictionary of Arrays
+    def state(self) -> dict:
+        return {
+            't': self.t,
+            'pos': self.system.pos.copy(),
+            'vel': self.system.vel.copy(),
+            'fixed': self.system.fixed.copy(),
+            'node1': self.system.node1.copy(),
+            'node2': self.system.node2.copy(),
+            'order': self.topology.order.copy()     # Builder Index of every Node, as compiling reorders them
+        }
+
+    def save_state(self, path: str) -> None:
+        np.savez(path, **self.state())
+
+    # Sheet of any Size generated in Bulk (a Rope is a Sheet with height 1)
+    def sheet(self, width: int, height: int, spacing: float = 0.5, shear: bool = False, bend: bool = False):
+
+        pos, node1, node2, length, kind = grid_topology(width, height, spacing, shear = shear, bend = bend)
+
+        # Cross and Bending Springs are softer, as in cloth2
+        elasticity = np.where(kind == STRUCTURAL, self.elasticity, self.elasticity / 8)
+
+        # The two Corners of the Top Row are Fixed
+        fixed = np.array([(height - 1) * width, height * width - 1])
+
+        self.system = ParticleSystem.from_arrays(
+            pos = pos,
+            node1 = node1,
+            node2 = node2,
+            length = length,
+            elasticity = elasticity,
+            mass = self.mass,
+            fixed = fixed,
+            friction = self.friction
+        )
 
-    def run(self):
+        # Views are only needed to render and interact with the Sheet
+        if not self.headless:
+            self.create_views()
+        return self.run()
 
-        dt, g = self.dt, self.gravity
+    # Whatever the Builder, Springs are deduplicated and the Nodes reordered once before the first Step
+    def compile(self, reorder: bool = True):
 
-        while True:
-            rate(1/dt)
-            if self.drag or not self.simulating: continue
+        system = self.system
+        self.topology = Topology.compile(system.node1, system.node2, system.length, system.elasticity, system.points_num, reorder)
+        self.system = self.topology.apply(system)
+        if self.topology.duplicates:
+            logging.info(f"Merged {self.topology.duplicates} duplicate springs")
+
+        # The Parallel Pass sorts the Springs by Block, before any View is bound to their Rows
+        if self.parallel is not None:
+            self.parallel.prepare(self.system)
 
-            # if self.event.event == 'mousedown':
-            #     logging.warning('Mouse Down')
+        # Views of the Builder point at the old Rows
+        if self.points:
+            self.create_views()
 
-            for spring in self.springs:
-                spring.apply_constraints()
-            for point in self.points:
-                point.add_force(point.mass * g) # A bit ugly
-                point.update(dt)
-            for spring in self.springs:
-                spring.display()
+    # Points and Springs viewing every Row of the System
+    def create_views(self):
+        self.points = [Point.view(self.system, i, self.integration) for i in range(self.system.points_num)]
+        self.springs = [Spring.view(self.system, i, self.points[a], self.points[b]) for i, (a, b) in enumerate(zip(self.system.node1.tolist(), self.system.node2.tolist()))]
 
-            self.print_energy()
-            self.t += dt
-            plt.show(block=False)
+    def run(self):
 
+        # Gather every Point and Spring into the Arrays stepped by the Solver
+        if self.system is None:
+            self.system = ParticleSystem.from_views(self.points, self.springs)
+        if self.topology is None:
+            self.compile()
+
+        # The first Frame is the initial State
+        if self.recording is not None:
+            from recorder import TrajectoryWriter
+            self.recorder = TrajectoryWriter(system = self.system, gravity = self.gravity, dt = self.dt, order = self.topology.order, **self.recording)
+            self.recorder.record(self.t, self.system)
+            atexit.register(self.recorder.close)
+
+        if self.headless:
+            if self.server is not None:
+                state = self.serve(self.steps, self.duration)
+            else:
+                state = self.simulate(self.steps, self.duration)
+            if self.output is not None:
+                self.save_state(self.output)
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.profile_path is not None:
+                self.profiler.dump(self.profile_path)
+            return state
+
+        from vpython import rate
+        from renderer import Renderer, BatchRenderer, draw_obstacles
+
+        if self.render == 'batched':
+            self.renderer = BatchRenderer(self.system, self.springs)
+        else:
+            self.renderer = Renderer(self.points, self.springs)
+        if self.obstacles is not None:
+            draw_obstacles(self.obstacles.obstacles)
+        self.picker.update(self.system.pos)
+
+        # Physics Steps owed to the Frames drawn so far, so the Simulation keeps running in real Time
+        steps_due = 0.0
+        if self.profile_path is not None:
+            atexit.register(self.profiler.dump, self.profile_path)
 
+        while True:
+            rate(self.fps)
+
+            # While paused the Loop sleeps until the Run Button or a Mouse Event wakes it up
+            self.event.clear()
+            self.apply_commands()
+            if not self.simulating:
+                steps_due = 0.0
+                self.event.wait(1)
+                continue
+
+            steps_due += 1 / (self.fps * self.dt)
+            for _ in range(int(steps_due)):
+                self.step()
+            steps_due -= int(steps_due)
+            with self.profiler.phase('render'):
+                self.renderer.draw()
+            with self.profiler.phase('picking'):
+                self.picker.update(self.system.pos)
+            if self.server is not None:
+                self.server.publish(self.t, self.system)
+
+            with self.profiler.phase('plot'):
+                self.print_energy()
@@ -0,0 +1,180 @@
+import argparse
+import csv
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from simulation import Simulation
+from ensemble import Ensemble
+
+# Parameters that can be swept, in the Order of the Table Columns
+PARAMETERS = ('elasticity', 'mass', 'dt', 'integration', 'friction')
+
+
+# Every Combination of the Parameter Values
+def expand(grid: dict) -> list:
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+# Runs one headless Simulation and measures its Stability
+def run(scene: str, duration: float, params: dict, blowup: float = 100) -> dict:
+
+    sim = Simulation(
+        elasticity = params['elasticity'],
+        mass = params['mass'],
+        friction = params['friction'],
+        gravity = (0, -9.81, 0),
+        dt = params['dt'],
+        integration = params['integration'],
+        headless = True,
+        steps = 0,
+        energy_interval = 1
+    )
+    sim.scene(scene)
+    system = sim.system
+
+    start = time.perf_counter()
+    max_deformation = 0.0
+    blown_up = False
+    first = None
+    for _ in range(round(duration / sim.dt)):
+        sim.step()
+
+        # The Monitor is a Ring Buffer, so the first Total is kept aside before it can be overwritten
+        if first is None:
+            first = sim.energy.latest()[sim.energy.TOTAL]
+
+        # A Spring stretched beyond blowup times its Rest Length (or a NaN) means the Run diverged
+        deformation = float(np.abs(system.deformation).max(initial = 0))
+        max_deformation = max(max_deformation, deformation)
+        if not np.isfinite(deformation) or deformation > blowup * system.length.max(initial = 1):
+            blown_up = True
+            break
+    wall_time = time.perf_counter() - start
+
+    # Drift of the Total Energy relative to the first Sample
+    last = sim.energy.latest()[sim.energy.TOTAL]
+    drift = (last - first) / max(abs(first), np.finfo(float).eps)
+
+    return {
+        **params,
+        'energy_drift': float(drift),
+        'max_deformation': max_deformation,
+        'blown_up': blown_up,
+        'simulated_time': sim.t,
+        'wall_time': wall_time
+    }
+
+
+# Runs every Combination sharing dt and Integration as one Ensemble, stepped by a single vectorized Loop
+def run_ensemble(scene: str, duration: float, combinations: list, blowup: float = 100) -> list:
+
+    groups = {}
+    for index, params in enumerate(combinations):
+        groups.setdefault((params['dt'], params['integration']), []).append(index)
+
+    results = [None] * len(combinations)
+    for (dt, integration), indices in groups.items():
+
+        # Elasticities scale linearly in every Builder, so the Scene is built once with Unit Elasticity
+        base = Simulation(elasticity = 1, mass = 1, friction = 0, gravity = (0, -9.81, 0), dt = dt, integration = integration, headless = True, steps = 0)
+        base.scene(scene)
+        group = [combinations[index] for index in indices]
+        ensemble = Ensemble(base.system, len(group), base.gravity, dt, integration)
+        ensemble.set_elasticity(np.array([params['elasticity'] for params in group])[:, None] * base.system.elasticity)
+        ensemble.set_mass([params['mass'] for params in group])
+        ensemble.set_friction([params['friction'] for params in group])
+
+        system = ensemble.system
+        copies = len(group)
+        limit = blowup * system.length.max(initial = 1)
+        running = np.ones(copies, dtype = bool)
+        max_deformation = np.zeros(copies)
+        simulated_time = np.zeros(copies)
+        first = last = None
+
+        start = time.perf_counter()
+        with np.errstate(all = 'ignore'):
+            for _ in range(round(duration / dt)):
+                ensemble.step()
+
+                deformation = np.abs(system.deformation).reshape(copies, -1).max(axis = 1, initial = 0)
+                max_deformation[running] = np.maximum(max_deformation[running], deformation[running])
+                simulated_time[running] = ensemble.t
+                total = ensemble.total_energy()
+                first = total if first is None else first
+                last = np.where(running, total, last) if last is not None else total
+
+                # Diverged Instances are frozen (every Node Fixed), so they stop costing NaNs and Overflows
+                diverged = running & (~np.isfinite(deformation) | (deformation > limit))
+                if diverged.any():
+                    running &= ~diverged
+                    system.fixed.reshape(copies, -1)[diverged] = True
+                if not running.any():
+                    break
+        wall_time = (time.perf_counter() - start) / copies
+
+        drift = (last - first) / np.maximum(np.abs(first), np.finfo(float).eps)
+        for k, index in enumerate(indices):
+            results[index] = {
+                **combinations[index],
+                'energy_drift': float(drift[k]),
+                'max_deformation': float(max_deformation[k]),
+                'blown_up': not running[k],
+                'simulated_time': float(simulated_time[k]),
+                'wall_time': wall_time
+            }
+    return results
+
+
+def table(results: list) -> str:
+
+    columns = list(results[0])
+    rows = [[f'{value:.4g}' if isinstance(value, float) else str(value) for value in result.values()] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ['  '.join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines += ['  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows]
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+
+    """
+        Expands a Grid of Parameters, runs every Combination headless on a Process Pool
+        and gathers Energy Drift, Max Deformation, Blow-Up Flag and Wall Time in one Table.
+        With --ensemble the Combinations sharing dt and Integration are stepped together as one Ensemble
+        in this Process, and the Wall Time is the Group Time divided by the Number of Combinations
+    """
+    parser = argparse.ArgumentParser(
+        prog='Cloth Simulation Sweep',
+        description='Runs a headless simulation for every combination of the given parameters'
+    )
+    parser.add_argument('-t', '--type', default = 'rope')
+    parser.add_argument('--time', type = float, default = 5)
+    parser.add_argument('--elasticity', type = float, nargs = '+', default = [1000])
+    parser.add_argument('--mass', type = float, nargs = '+', default = [10])
+    parser.add_argument('--dt', type = float, nargs = '+', default = [0.01])
+    parser.add_argument('--integration', nargs = '+', default = ['Verlet', 'RK1'])
+    parser.add_argument('--friction', type = float, nargs = '+', default = [0])
+    parser.add_argument('-w', '--workers', type = int, default = os.cpu_count())
+    parser.add_argument('--ensemble', action = 'store_true')
+    parser.add_argument('-o', '--output')
+    args = parser.parse_args()
+
+    logging.basicConfig(level = logging.INFO, format = '%(message)s')
+
+    combinations = expand({name: getattr(args, name) for name in PARAMETERS})
+    if args.ensemble:
+        results = run_ensemble(args.type, args.time, combinations)
+    else:
+        with ProcessPoolExecutor(max_workers = args.workers) as pool:
+            results = list(pool.map(run, itertools.repeat(args.type), itertools.repeat(args.time), combinations))
+
+    logging.info(table(results))
+    if args.output is not None:
+        with open(args.output, 'w', newline = '') as file:
+            writer = csv.DictWriter(file, fieldnames = list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
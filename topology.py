@@ -0,0 +1,197 @@
+import numpy as np
+from engine import ParticleSystem
+
+# Spring Types, stored alongside the Index Pairs so Elasticity can be assigned per Type
+STRUCTURAL, SHEAR, BEND = 0, 1, 2
+
+
+# Positions of a width x height sheet hanging in the xy plane, centered on the origin
+def grid_positions(width: int, height: int, spacing: float) -> np.ndarray:
+
+    x = (np.arange(width) - (width - 1) / 2) * spacing
+    y = (np.arange(height) - (height - 1) / 2) * spacing
+    pos = np.zeros((height, width, 3))
+    pos[:, :, 0] = x[None, :]
+    pos[:, :, 1] = y[:, None]
+    return pos.reshape(-1, 3)
+
+
+# Index Pairs of the Springs of a width x height sheet, built in bulk with index arithmetic
+def grid_springs(width: int, height: int, structural: bool = True, shear: bool = False, bend: bool = False) -> tuple:
+
+    index = np.arange(width * height).reshape(height, width)
+    pairs = []
+
+    # Horizontal and Vertical Springs between Neighbors
+    if structural:
+        pairs.append((index[:, :-1], index[:, 1:], STRUCTURAL))
+        pairs.append((index[:-1, :], index[1:, :], STRUCTURAL))
+
+    # Cross Springs between Diagonal Neighbors
+    if shear:
+        pairs.append((index[:-1, :-1], index[1:, 1:], SHEAR))
+        pairs.append((index[1:, :-1], index[:-1, 1:], SHEAR))
+
+    # Springs Skipping one Node, resisting Folds
+    if bend:
+        pairs.append((index[:, :-2], index[:, 2:], BEND))
+        pairs.append((index[:-2, :], index[2:, :], BEND))
+
+    node1 = np.concatenate([first.ravel() for first, _, _ in pairs] + [np.zeros(0, dtype = np.intp)])
+    node2 = np.concatenate([second.ravel() for _, second, _ in pairs] + [np.zeros(0, dtype = np.intp)])
+    kind = np.concatenate([np.full(first.size, k, dtype = np.int8) for first, _, k in pairs] + [np.zeros(0, dtype = np.int8)])
+    return node1.astype(np.intp), node2.astype(np.intp), kind
+
+
+# Complete Topology of a sheet: Positions, Index Pairs, Rest Lengths and Spring Types
+def grid_topology(width: int, height: int, spacing: float, structural: bool = True, shear: bool = False, bend: bool = False) -> tuple:
+
+    pos = grid_positions(width, height, spacing)
+    node1, node2, kind = grid_springs(width, height, structural, shear, bend)
+
+    # Springs are at Rest in the initial Configuration
+    length = spacing * np.array((1, np.sqrt(2), 2))[kind]
+    return pos, node1, node2, length, kind
+
+
+# Colors the Springs so that Springs of the same Color share no Node, and can be processed together
+def color_springs(node1: np.ndarray, node2: np.ndarray, points_num: int) -> np.ndarray:
+
+    # Random Tie-Breaks keep the Rounds short, whereas Index Order would chain Springs along the Mesh
+    springs_num = len(node1)
+    shuffle = np.random.default_rng(0).permutation(springs_num)
+    colors = np.full(springs_num, -1, dtype = np.int32)
+    remaining = np.arange(springs_num)
+    color = 0
+    while len(remaining):
+
+        # Springs between the busiest Nodes go first, as they are the ones that would need extra Colors
+        degree = np.bincount(node1[remaining], minlength = points_num) + np.bincount(node2[remaining], minlength = points_num)
+        priority = np.empty(springs_num, dtype = np.int64)
+        priority[np.lexsort((shuffle, -(degree[node1] + degree[node2])))] = np.arange(springs_num)
+
+        # Every Color is a maximal Matching: Springs keep joining it until none is left with both Nodes free
+        used = np.zeros(points_num, dtype = bool)
+        candidates = remaining
+        while len(candidates):
+
+            # A Spring joins the Color when it has the lowest Priority on both of its Nodes among the Candidates
+            lowest = np.full(points_num, springs_num)
+            np.minimum.at(lowest, node1[candidates], priority[candidates])
+            np.minimum.at(lowest, node2[candidates], priority[candidates])
+            chosen = (lowest[node1[candidates]] == priority[candidates]) & (lowest[node2[candidates]] == priority[candidates])
+            colors[candidates[chosen]] = color
+            used[node1[candidates[chosen]]] = True
+            used[node2[candidates[chosen]]] = True
+            candidates = candidates[~(used[node1[candidates]] | used[node2[candidates]])]
+
+        remaining = remaining[colors[remaining] < 0]
+        color += 1
+    return colors
+
+
+# Graph Levels of a Breadth-First Search in Cuthill-McKee Order: every Level lists its Nodes by the Position of their
+# first Parent in the previous Level, then by increasing Degree
+def cuthill_mckee_levels(start: int, neighbors: np.ndarray, offsets: np.ndarray, degree: np.ndarray, visited: np.ndarray) -> list:
+
+    visited[start] = True
+    levels = [np.array([start])]
+    while True:
+        frontier = levels[-1]
+
+        # Every Neighbor of the Frontier, with the Rank of the Parent it was reached from
+        counts = offsets[frontier + 1] - offsets[frontier]
+        parent = np.repeat(np.arange(len(frontier)), counts)
+        first = np.repeat(offsets[frontier] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        reached = neighbors[first]
+        fresh = ~visited[reached]
+        reached, parent = reached[fresh], parent[fresh]
+        if len(reached) == 0:
+            return levels
+
+        # A Node reached by several Parents belongs to the first one
+        order = np.lexsort((degree[reached], parent))
+        reached, parent = reached[order], parent[order]
+        _, unique = np.unique(reached, return_index = True)
+        level = reached[np.sort(unique)]
+        visited[level] = True
+        levels.append(level)
+
+
+# Reverse Cuthill-McKee Ordering of the Nodes: Springs end up joining Nodes with close Indices, so every Pass
+# reads and writes the Node Arrays in nearby Places. Returns the old Index of every new Position
+def reverse_cuthill_mckee(node1: np.ndarray, node2: np.ndarray, points_num: int) -> np.ndarray:
+
+    # Adjacency in compressed Form: the Neighbors of Node i are neighbors[offsets[i]:offsets[i + 1]]
+    ends = np.concatenate((node1, node2))
+    others = np.concatenate((node2, node1))
+    sort = np.argsort(ends, kind = 'stable')
+    neighbors = others[sort]
+    degree = np.bincount(ends, minlength = points_num)
+    offsets = np.concatenate(([0], np.cumsum(degree)))
+
+    visited = np.zeros(points_num, dtype = bool)
+    ordering = []
+    while not visited.all():
+
+        # Each Component starts from a Node of low Degree on the far Side of a first Search (pseudo-peripheral Node)
+        candidates = np.flatnonzero(~visited)
+        start = candidates[np.argmin(degree[candidates])]
+        last = cuthill_mckee_levels(start, neighbors, offsets, degree, visited.copy())[-1]
+        start = last[np.argmin(degree[last])]
+        ordering.extend(cuthill_mckee_levels(start, neighbors, offsets, degree, visited))
+
+    return np.concatenate(ordering)[::-1] if ordering else np.zeros(0, dtype = np.intp)
+
+
+class Topology:
+
+    __slots__ = ('node1', 'node2', 'length', 'elasticity', 'order', 'duplicates')
+
+    # Frozen Topology: read-only Spring Arrays and the Ordering of the Nodes they refer to
+    def __init__(self, node1: np.ndarray, node2: np.ndarray, length: np.ndarray, elasticity: np.ndarray, order: np.ndarray, duplicates: int = 0) -> None:
+
+        # Variable Declaration
+        self.node1 = node1              # First Node of every Spring (the lower Index)
+        self.node2 = node2              # Second Node of every Spring
+        self.length = length            # Rest Length of every Spring
+        self.elasticity = elasticity    # Elasticity of every Spring
+        self.order = order              # Old Index of the Node at every new Position
+        self.duplicates = duplicates    # Springs merged into others while compiling
+        for array in (self.node1, self.node2, self.length, self.elasticity, self.order):
+            array.flags.writeable = False
+
+    # Canonical Form of any Set of Springs: Pairs ordered (low, high), Self-Springs dropped, Duplicates merged and,
+    # with reorder, Nodes renumbered by Reverse Cuthill-McKee and Springs sorted by their Nodes
+    @classmethod
+    def compile(cls, node1: np.ndarray, node2: np.ndarray, length: np.ndarray, elasticity: np.ndarray, points_num: int, reorder: bool = True) -> 'Topology':
+
+        node1, node2 = np.minimum(node1, node2), np.maximum(node1, node2)
+        keep = node1 != node2
+        node1, node2, length, elasticity = node1[keep], node2[keep], length[keep], elasticity[keep]
+
+        # Parallel Springs act as one with the summed Elasticity and the Elasticity-weighted Rest Length:
+        # k1 (d - L1) + k2 (d - L2) = (k1 + k2) (d - (k1 L1 + k2 L2) / (k1 + k2))
+        pairs, first, inverse = np.unique(node1 * points_num + node2, return_index = True, return_inverse = True)
+        merged_elasticity = np.bincount(inverse, elasticity, len(pairs))
+        weighted_length = np.bincount(inverse, elasticity * length, len(pairs))
+        plain_length = np.bincount(inverse, length, len(pairs)) / np.bincount(inverse, minlength = len(pairs))
+        merged_length = np.divide(weighted_length, merged_elasticity, out = plain_length, where = merged_elasticity != 0)
+        duplicates = len(node1) - len(pairs)
+
+        # Renumbered Nodes, then Springs sorted by their (low, high) Nodes
+        order = reverse_cuthill_mckee(node1[first], node2[first], points_num) if reorder else np.arange(points_num)
+        rank = np.empty(points_num, dtype = np.intp)
+        rank[order] = np.arange(points_num)
+        first1, first2 = rank[node1[first]], rank[node2[first]]
+        node1, node2 = np.minimum(first1, first2), np.maximum(first1, first2)
+        springs = np.lexsort((node2, node1))
+
+        return cls(node1[springs], node2[springs], merged_length[springs], merged_elasticity[springs], order, duplicates)
+
+    # System with the Nodes of another one in compiled Order and the compiled Springs
+    def apply(self, system: ParticleSystem) -> ParticleSystem:
+
+        arrays = {name: array[self.order] for name, array in system.arrays().items() if name not in ('node1', 'node2', 'length', 'elasticity')}
+        arrays.update(node1 = self.node1, node2 = self.node2, length = self.length, elasticity = self.elasticity)
+        return ParticleSystem.from_dict(arrays)
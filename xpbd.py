@@ -0,0 +1,117 @@
+import numpy as np
+from engine import ParticleSystem
+from topology import color_springs
+
+class XPBDSolver:
+
+    __slots__ = ('iterations', 'mode', 'batches', 'springs', 'owner', 'slot', 'system', 'springs_num', 'multiplier')
+
+    def __init__(self, iterations: int = 10, mode: str = 'gauss-seidel') -> None:
+
+        # Variable Declaration
+        self.iterations = iterations    # Projection Sweeps per Step, more Sweeps give stiffer and more accurate Springs
+        self.mode = mode                # Gauss-Seidel (one Color at a Time) or Jacobi (every Spring at once)
+        self.batches = None             # Nodes, Rest Lengths and Compliances of every Color
+        self.springs = None             # Spring Indices of every Color
+        self.owner = None               # Color of every Spring
+        self.slot = None                # Place of every Spring inside its Color
+        self.system = None              # System the Batches were built for
+        self.springs_num = None         # Number of Springs the Batches were built for
+        self.multiplier = None          # Lagrange Multiplier of every Distance Constraint
+
+    # Springs of the same Color share no Node, so a whole Color is projected at once without Conflicts
+    def prepare(self, system: ParticleSystem) -> None:
+
+        if self.system is system and self.springs_num == system.springs_num:
+            return
+        if self.mode == 'jacobi':
+            batches = [np.arange(system.springs_num)]
+        else:
+            colors = color_springs(system.node1, system.node2, system.points_num)
+            order = np.argsort(colors, kind = 'stable')
+            bounds = np.searchsorted(colors[order], np.arange(colors.max(initial = -1) + 2))
+            batches = [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+        # Everything a Batch needs is gathered once, so a Sweep only touches Positions
+        self.batches = [(system.node1[springs], system.node2[springs], system.length[springs], 1 / system.elasticity[springs]) for springs in batches]
+        self.springs = batches
+        self.owner = np.zeros(system.springs_num, dtype = np.intp)
+        self.slot = np.zeros(system.springs_num, dtype = np.intp)
+        for color, springs in enumerate(batches):
+            self.owner[springs] = color
+            self.slot[springs] = np.arange(len(springs))
+        self.system = system
+        self.springs_num = system.springs_num
+
+    # Follows a Swap-Remove of the System (Spring last moved to index): removing a Spring keeps the Coloring valid,
+    # so the Spring only leaves its Batch, the same Way it left the System
+    def remove_spring(self, system: ParticleSystem, index: int, last: int) -> None:
+
+        if self.system is not system or self.springs_num != last + 1:
+            return
+        color, slot = self.owner[index], self.slot[index]
+        springs = self.springs[color]
+        end = len(springs) - 1
+        if slot != end:
+            self.slot[springs[end]] = slot
+        arrays = []
+        for array in (springs,) + self.batches[color]:
+            array[slot] = array[end]
+            arrays.append(array[:end])
+        self.springs[color], self.batches[color] = arrays[0], tuple(arrays[1:])
+
+        if index != last:
+            self.springs[self.owner[last]][self.slot[last]] = index
+            self.owner[index], self.slot[index] = self.owner[last], self.slot[last]
+        self.owner, self.slot = self.owner[:last], self.slot[:last]
+        self.springs_num = last
+
+    # Projects a Batch of Distance Constraints, returning the Position Change of both Nodes
+    def project(self, system: ParticleSystem, batch: tuple, multiplier: np.ndarray, inv_mass: np.ndarray, dt: float) -> tuple:
+
+        node1, node2, length, compliance = batch
+        displacement = system.pos[node1] - system.pos[node2]
+        distance = np.maximum(np.sqrt(np.einsum('ij,ij->i', displacement, displacement)), np.finfo(float).tiny)
+
+        # Compliance is the Inverse of the Elasticity, scaled by the Timestep
+        compliance = compliance / dt ** 2
+        weight = inv_mass[node1] + inv_mass[node2] + compliance
+        delta = (length - distance - compliance * multiplier) / weight
+        multiplier += delta
+
+        correction = (delta / distance)[:, None] * displacement
+        return inv_mass[node1, None] * correction, inv_mass[node2, None] * correction
+
+    def step(self, system: ParticleSystem, dt: float, g: np.ndarray) -> None:
+
+        self.prepare(system)
+        free = ~system.fixed
+        inv_mass = np.where(system.fixed, 0, system.inv_mass)
+
+        # Predict Positions from Velocity, Gravity and Friction
+        system.vel[free] += dt * (g - system.friction[free, None] * system.vel[free])
+        previous = system.pos.copy()
+        system.pos[free] += dt * system.vel[free]
+
+        self.multiplier = [np.zeros(len(batch[0])) for batch in self.batches]
+        for _ in range(self.iterations):
+            if self.mode == 'jacobi':
+
+                # Every Constraint at once, Corrections averaged over the Springs sharing a Node
+                node1, node2 = self.batches[0][:2]
+                first, second = self.project(system, self.batches[0], self.multiplier[0], inv_mass, dt)
+                count = np.maximum(np.bincount(node1, minlength = system.points_num) + np.bincount(node2, minlength = system.points_num), 1)
+                for axis in range(3):
+                    shift = np.bincount(node1, first[:, axis], system.points_num) - np.bincount(node2, second[:, axis], system.points_num)
+                    system.pos[:, axis] += shift / count
+            else:
+                for batch, multiplier in zip(self.batches, self.multiplier):
+                    first, second = self.project(system, batch, multiplier, inv_mass, dt)
+                    system.pos[batch[0]] += first
+                    system.pos[batch[1]] -= second
+
+        # Velocities follow from the Positions, prev_pos keeps Verlet usable afterwards
+        system.vel[free] = (system.pos[free] - previous[free]) / dt
+        system.prev_pos[:] = previous
+        system.acc[:] = 0
+        system.elastic = None